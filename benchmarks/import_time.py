@@ -0,0 +1,86 @@
+"""
+Cold-start import check for the Streamlit app.
+
+Imports `src.app.main` in fresh interpreters and fails when the import takes
+longer than a time budget, or when it loads a dependency that only the graph
+view or the word cloud needs. Those are imported on first use of their view.
+
+Usage (from the repository root):
+
+    python -m benchmarks.import_time --budget 1.2
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+APP_MODULE = "src.app.main"
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_BUDGET_SECONDS = 1.2
+# Heavy dependencies that opening the app (and the Data Exploration view) must not load.
+DEFERRED_MODULES = (
+    "networkx",
+    "scipy",
+    "matplotlib",
+    "wordcloud",
+    "pyvis",
+    "IPython",
+    "community",
+    "src.app.model",
+    "src.app.presenter.presenter",
+)
+
+_PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import {APP_MODULE}
+seconds = time.perf_counter() - started
+print(json.dumps({{"seconds": seconds, "modules": sorted(sys.modules)}}))
+"""
+
+
+def measure_import() -> dict:
+    """Import time and loaded modules of one cold import of the app."""
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=REPO_ROOT,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_BUDGET_SECONDS,
+        help="Seconds allowed for the import.",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Cold imports to run; the fastest counts."
+    )
+    args = parser.parse_args(argv)
+
+    runs = [measure_import() for _ in range(args.repeat)]
+    seconds = min(run["seconds"] for run in runs)
+    loaded = [module for module in DEFERRED_MODULES if module in runs[0]["modules"]]
+
+    print(f"import {APP_MODULE}: {seconds:.3f} s (budget {args.budget:.3f} s)")
+    failed = False
+    if seconds > args.budget:
+        print("FAIL: import time is over budget", file=sys.stderr)
+        failed = True
+    if loaded:
+        print(f"FAIL: loaded at import time: {', '.join(loaded)}", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Serial against parallel exact closeness and betweenness by graph size.
+
+Backs `parallel.PARALLEL_MIN_NODES`: the smallest graphs for which sharing the
+BFS runs among workers beats a single process. Graphs are Barabási-Albert graphs
+with the sparsity of the sampled user networks.
+
+Usage (from the repository root):
+
+    python -m benchmarks.parallel_threshold --workers 2 --sizes 100 200 300 500 1000
+
+With `--ignore-affinity` the workers run even when there are fewer CPUs than
+workers, which measures the fixed cost of a parallel call on small hosts.
+"""
+
+import argparse
+import sys
+import time
+from typing import Callable, List, Optional
+
+import networkx as nx
+
+from src.app.utils import metrics, parallel
+
+ALGORITHMS = {
+    "closeness": metrics.closeness_centrality,
+    "betweenness": metrics.betweenness_centrality,
+}
+
+
+def best_time(fn: Callable[[], object], repeat: int) -> float:
+    """Fastest of `repeat` runs of `fn`, in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[50, 100, 200, 300, 500, 1000]
+    )
+    parser.add_argument("--edges-per-node", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--ignore-affinity",
+        action="store_true",
+        help="Run the workers even with fewer CPUs than workers.",
+    )
+    args = parser.parse_args(argv)
+
+    if args.ignore_affinity:
+        parallel.available_cpus = lambda: args.workers
+    elif parallel.available_cpus() < args.workers:
+        print(
+            f"Only {parallel.available_cpus()} CPUs available; "
+            "use --ignore-affinity to measure anyway.",
+            file=sys.stderr,
+        )
+        return 1
+    # Every size goes through the pool, whatever the current threshold.
+    parallel.PARALLEL_MIN_NODES = 0
+    # Start the pool, so that its start-up is not part of the first measurement.
+    metrics.closeness_centrality(nx.path_graph(parallel.PLAN_CHUNKS), args.workers)
+
+    for size in args.sizes:
+        graph = nx.barabasi_albert_graph(size, args.edges_per_node, seed=1)
+        for name, algorithm in ALGORITHMS.items():
+            serial = best_time(lambda: algorithm(graph, 1), args.repeat)
+            shared = best_time(lambda: algorithm(graph, args.workers), args.repeat)
+            print(
+                f"{size:>6} nodes {name:<12} serial {serial * 1000:8.1f} ms  "
+                f"{args.workers} workers {shared * 1000:8.1f} ms"
+            )
+    parallel.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
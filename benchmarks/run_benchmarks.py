@@ -0,0 +1,231 @@
+"""
+Benchmark harness for the analysis pipeline.
+
+Times CSV ingestion, `create_user_network`, every metric of
+`get_network_graph_stats`, every community engine and
+`NetworkPresenter.visualize_network` on synthetic datasets, and reports wall time
+and peak traced memory per stage as JSON.
+
+Usage (from the repository root):
+
+    python -m benchmarks.run_benchmarks --sizes 10000 100000 1000000 --output bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_interactions, generate_tweets
+from src.app.presenter.presenter import NetworkPresenter
+from src.app.utils.community_engines import available_engines
+from src.app.utils.constants import (
+    APPROX_CENTRALITY_NODE_THRESHOLD,
+    DEFAULT_CENTRALITY_SAMPLES,
+    MetricsBackend,
+    RenderMode,
+)
+from src.app.utils.metrics import GRAPH_METRICS, CentralityOptions, GraphStats
+from src.app.utils.sparse_metrics import SPARSE_METRICS
+from src.app.utils.utils import create_user_network, create_user_network_from_csv
+
+SCHEMAS: Dict[str, Callable[..., pd.DataFrame]] = {
+    "content": generate_tweets,
+    "interactions": generate_interactions,
+}
+# Girvan-Newman recomputes edge betweenness after every removed edge, which does
+# not finish on larger graphs whatever the time limit; it is skipped above this.
+GIRVAN_NEWMAN_MAX_EDGES = 5_000
+
+
+@dataclass
+class BenchmarkResult:
+    stage: str
+    name: str
+    schema: str
+    interactions: int
+    seconds: float
+    peak_memory_mb: float = None
+    details: Dict[str, Any] = field(default_factory=dict)
+
+
+def measure(fn: Callable[[], Any], trace_memory: bool):
+    """Wall time of `fn`, plus its peak traced allocation in a second run."""
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+
+    peak_memory_mb = None
+    if trace_memory:
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_memory_mb = peak / 2**20
+
+    return result, seconds, peak_memory_mb
+
+
+def run_dataset(
+    schema: str, size: int, args: argparse.Namespace
+) -> List[BenchmarkResult]:
+    results = []
+
+    def record(stage: str, name: str, fn: Callable[[], Any], **details):
+        value, seconds, peak = measure(fn, args.memory)
+        result = BenchmarkResult(stage, name, schema, size, seconds, peak, details)
+        results.append(result)
+        _log(result)
+        return value
+
+    df = SCHEMAS[schema](size, seed=args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f"{schema}-{size}.csv")
+        df.to_csv(path, index=False)
+        record(
+            "ingestion",
+            "read_csv",
+            lambda: pd.read_csv(path),
+            bytes=os.path.getsize(path),
+        )
+        record("ingestion", "create_user_network_from_csv", lambda: _stream(path))
+
+    network = record("build", "create_user_network", lambda: create_user_network(df))
+    graph = network.graph
+    adjacency = network.adjacency
+    details = {"users": graph.number_of_nodes(), "edges": graph.number_of_edges()}
+
+    for backend in MetricsBackend:
+        options = CentralityOptions(
+            approximate=not args.exact
+            and graph.number_of_nodes() > APPROX_CENTRALITY_NODE_THRESHOLD,
+            samples=DEFAULT_CENTRALITY_SAMPLES,
+            seed=args.seed,
+            backend=backend.value,
+        )
+        # Only the SPARSE_METRICS depend on the backend.
+        sparse = backend == MetricsBackend.SPARSE
+        for metric in SPARSE_METRICS if sparse else GRAPH_METRICS:
+            record(
+                "metrics",
+                f"{metric}[{backend.name.lower()}]",
+                lambda: GraphStats(graph, 0, options, adjacency=adjacency)[metric],
+                centrality=options.describe(),
+                **details,
+            )
+
+    for engine in available_engines():
+        edges = graph.number_of_edges()
+        if engine == "Girvan Newman" and edges > args.girvan_newman_max_edges:
+            print(f"Skipping {engine} on {edges} edges", file=sys.stderr)
+            continue
+        record(
+            "communities",
+            engine,
+            lambda: network.run_community_detection(
+                graph, engine, time_limit=args.time_limit, seed=args.seed
+            ),
+            time_limit=args.time_limit,
+            **details,
+        )
+
+    for render_mode in (RenderMode.PYVIS, RenderMode.WEBGL):
+        record(
+            "rendering",
+            f"visualize_network[{render_mode.value}]",
+            lambda: NetworkPresenter(network).visualize_network(
+                {}, args.render_nodes, "louvain", render_mode
+            ),
+            top_neighbours_nodes=args.render_nodes,
+        )
+
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument(
+        "--schemas", nargs="+", choices=list(SCHEMAS), default=list(SCHEMAS)
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--exact", action="store_true", help="Never use approximate centralities."
+    )
+    parser.add_argument(
+        "--time-limit",
+        type=float,
+        default=30.0,
+        help="Seconds per time-bounded engine.",
+    )
+    parser.add_argument(
+        "--girvan-newman-max-edges",
+        type=int,
+        default=GIRVAN_NEWMAN_MAX_EDGES,
+        help="Skip Girvan-Newman on graphs with more edges.",
+    )
+    parser.add_argument(
+        "--render-nodes", type=int, default=100, help="Top-degree nodes to render."
+    )
+    parser.add_argument(
+        "--no-memory",
+        dest="memory",
+        action="store_false",
+        help="Skip the traced-memory runs.",
+    )
+    parser.add_argument("--output", help="Write JSON results here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        for schema in args.schemas:
+            results.extend(run_dataset(schema, size, args))
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "arguments": vars(args),
+        "results": [asdict(result) for result in results],
+    }
+    output = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    else:
+        print(output)
+    return 0
+
+
+def _stream(path: str):
+    with open(path, "rb") as file:
+        return create_user_network_from_csv(file)
+
+
+def _log(result: BenchmarkResult):
+    memory = (
+        "" if result.peak_memory_mb is None else f" {result.peak_memory_mb:9.1f} MB"
+    )
+    print(
+        f"{result.schema:>12} {result.interactions:>9} {result.stage:>11} "
+        f"{result.name:<40} {result.seconds:9.3f} s{memory}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Synthetic social-interaction datasets for benchmarks.
+
+Users belong to communities, activity and popularity are heavy-tailed (Zipf),
+and most interactions stay inside the author's community, which gives graphs
+with hubs and community structure similar to real retweet/mention data.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+INTERACTION_TYPES = np.array(["retweet", "reply", "mention", "like"])
+_WORDS = np.array(["great", "flight", "delayed", "thanks", "service", "late", "bag", "crew"])
+_HASHTAGS = np.array(["#travel", "#fail", "#delay", "#thankyou", "#airline"])
+
+
+def generate_interactions(
+    n_interactions: int,
+    n_users: Optional[int] = None,
+    n_communities: Optional[int] = None,
+    p_in_community: float = 0.8,
+    seed: int = 42,
+) -> pd.DataFrame:
+    """Interaction-list schema: who, to_whom, interaction_type, timestamp."""
+    rng = np.random.default_rng(seed)
+    population = _Population(rng, n_users or max(100, n_interactions // 10), n_communities)
+    sources = population.sample_users(n_interactions)
+    targets = population.sample_targets(sources, p_in_community)
+
+    return pd.DataFrame(
+        {
+            "who": population.names[sources],
+            "to_whom": population.names[targets],
+            "interaction_type": rng.choice(INTERACTION_TYPES, size=n_interactions),
+            "timestamp": _timestamps(rng, n_interactions),
+        }
+    )
+
+
+def generate_tweets(
+    n_interactions: int,
+    n_users: Optional[int] = None,
+    n_communities: Optional[int] = None,
+    p_in_community: float = 0.8,
+    max_mentions: int = 3,
+    seed: int = 42,
+) -> pd.DataFrame:
+    """
+    Tweet schema (name, text, tweet_created) whose texts contain
+    `n_interactions` mentions in total, 1 to `max_mentions` per tweet.
+    """
+    rng = np.random.default_rng(seed)
+    population = _Population(rng, n_users or max(100, n_interactions // 10), n_communities)
+
+    mentions_per_tweet = rng.integers(1, max_mentions + 1, size=n_interactions)
+    mentions_per_tweet = mentions_per_tweet[np.cumsum(mentions_per_tweet) <= n_interactions]
+    missing = n_interactions - mentions_per_tweet.sum()
+    if missing:
+        mentions_per_tweet = np.append(mentions_per_tweet, missing)
+    n_tweets = len(mentions_per_tweet)
+
+    authors = population.sample_users(n_tweets)
+    tweet_ids = np.repeat(np.arange(n_tweets), mentions_per_tweet)
+    targets = population.sample_targets(authors[tweet_ids], p_in_community)
+
+    tweet_starts = np.concatenate([[0], np.cumsum(mentions_per_tweet)[:-1]])
+    mentions = np.add.reduceat("@" + population.names[targets] + " ", tweet_starts)
+    words = rng.choice(_WORDS, size=n_tweets).astype(object)
+    hashtags = np.where(rng.random(n_tweets) < 0.3, rng.choice(_HASHTAGS, size=n_tweets), "")
+
+    return pd.DataFrame(
+        {
+            "name": population.names[authors],
+            "text": mentions + words + " " + hashtags.astype(object),
+            "tweet_created": _timestamps(rng, n_tweets),
+        }
+    )
+
+
+class _Population:
+    """Users with a community each and Zipf-distributed activity/popularity."""
+
+    def __init__(self, rng: np.random.Generator, n_users: int, n_communities: Optional[int]):
+        self.rng = rng
+        self.n_users = n_users
+        n_communities = n_communities or max(2, int(np.sqrt(n_users) / 2))
+        self.names = np.char.add("user", np.arange(n_users).astype(str)).astype(object)
+        self.community_of = rng.integers(0, n_communities, size=n_users)
+        self.members = np.argsort(self.community_of, kind="stable")
+        self.starts = np.searchsorted(
+            self.community_of[self.members], np.arange(n_communities)
+        )
+        self.sizes = np.bincount(self.community_of, minlength=n_communities)
+        weights = 1.0 / np.arange(1, n_users + 1) ** 1.1
+        self.popularity = weights / weights.sum()
+
+    def sample_users(self, size: int) -> np.ndarray:
+        return self.rng.choice(self.n_users, size=size, p=self.popularity)
+
+    def sample_targets(self, sources: np.ndarray, p_in_community: float) -> np.ndarray:
+        """Targets for `sources`: mostly a popular member of the source's community."""
+        targets = self.sample_users(len(sources))
+        community = self.community_of[sources]
+        local = self.rng.random(len(sources)) < p_in_community
+        offsets = self.sample_users(local.sum()) % self.sizes[community[local]]
+        targets[local] = self.members[self.starts[community[local]] + offsets]
+        return targets
+
+
+def _timestamps(rng: np.random.Generator, size: int) -> np.ndarray:
+    start = np.datetime64("2015-02-16T00:00:00")
+    seconds = np.sort(rng.integers(0, 14 * 24 * 3600, size=size))
+    return (start + seconds.astype("timedelta64[s]")).astype(str)
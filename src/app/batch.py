@@ -0,0 +1,350 @@
+"""
+Headless batch analysis of CSV exports, without Streamlit.
+
+Every file goes through the pipeline of the graph view: the user network is built
+(`create_user_network_from_csv`), sampled, its communities are detected on the
+top-degree subgraph and every metric of `get_network_graph_stats` is computed.
+Results are saved as snapshots (see `snapshot`) under the same keys the
+dashboard uses, so opening one of the files in the dashboard with the same
+settings reuses them instead of recomputing. With `--export-dir`, the per-user
+metrics and the partition of the sample (the `--max-nodes` users the graph view
+shows, not every user of the file) are also written as Parquet files for other
+tools.
+
+Files are analysed in parallel, one process per file. Once all are done, the
+snapshots of other files may be evicted to stay within
+`snapshot.DEFAULT_SNAPSHOT_MAX_BYTES`.
+
+Usage (from the repository root):
+
+    python batch.py data/exports/*.csv --jobs 4 --export-dir data/batch
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.app.model import UserNetwork
+from src.app.utils import snapshot
+from src.app.utils.community_engines import CommunityResult, available_engines
+from src.app.utils.constants import (
+    DEFAULT_CENTRALITY_SAMPLES,
+    DEFAULT_SEED,
+    CentralityMode,
+    MetricsBackend,
+    SamplingStrategy,
+)
+from src.app.utils.metrics import GRAPH_METRICS, CentralityOptions
+from src.app.utils.sampling import sample_network
+from src.app.utils.utils import DEFAULT_CHUNK_SIZE, create_user_network_from_csv
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BatchSettings:
+    """
+    Graph view settings to analyse with. The defaults are the dashboard's, so its
+    first view of a file finds everything precomputed.
+    """
+
+    max_nodes: int = 100
+    sampling_strategy: str = SamplingStrategy.TOP_DEGREE_EGO.value
+    sampling_seed: int = DEFAULT_SEED
+    algorithm: str = "Louvain"
+    params: Dict[str, Any] = field(default_factory=lambda: {"resolution": 1.0})
+    centrality_mode: str = CentralityMode.AUTO.value
+    centrality_samples: int = DEFAULT_CENTRALITY_SAMPLES
+    centrality_workers: int = 1
+    metrics_backend: str = MetricsBackend.SPARSE.value
+    chunksize: int = DEFAULT_CHUNK_SIZE
+
+
+@dataclass
+class BatchResult:
+    source: str
+    file_hash: str
+    users: int
+    edges: int
+    sampled_users: int
+    communities: int
+    modularity: float
+    seconds: float
+
+
+def analyze_file(
+    source: str,
+    settings: BatchSettings = BatchSettings(),
+    snapshot_root: Path = snapshot.DEFAULT_SNAPSHOT_ROOT,
+    export_dir: Optional[Path] = None,
+) -> BatchResult:
+    """
+    Analyse one CSV, saving its snapshots and, with `export_dir`, the Parquet
+    exports of its sample.
+    """
+    started = time.perf_counter()
+    file_hash = snapshot.hash_file(source)
+
+    full_path = snapshot.snapshot_path(snapshot_root, file_hash)
+    if snapshot.has_snapshot(full_path):
+        network = snapshot.load_network(full_path)
+    else:
+        with open(source, "rb") as file:
+            network, _ = create_user_network_from_csv(file, settings.chunksize)
+        snapshot.save_network(network, full_path)
+
+    sample_path = snapshot.snapshot_path(
+        snapshot_root,
+        file_hash,
+        settings.max_nodes,
+        settings.sampling_strategy,
+        settings.sampling_seed,
+    )
+    if snapshot.has_snapshot(sample_path):
+        sample = snapshot.load_network(sample_path)
+    else:
+        sample = sample_network(
+            network,
+            settings.sampling_strategy,
+            settings.max_nodes,
+            settings.sampling_seed,
+        )
+        snapshot.save_network(sample, sample_path)
+
+    sample.centrality_options = CentralityOptions.for_mode(
+        settings.centrality_mode,
+        sample.number_of_users(),
+        samples=settings.centrality_samples,
+        seed=DEFAULT_SEED,
+        workers=settings.centrality_workers,
+        backend=settings.metrics_backend,
+    )
+    snapshot.load_metrics(sample, sample_path)
+    community_result = _detect_communities(sample, sample_path, settings)
+    for name in ("degree", *GRAPH_METRICS):
+        sample.get_metric_values(name)
+    snapshot.save_metrics(sample, sample_path)
+
+    if export_dir is not None:
+        export_tables(sample, community_result, Path(export_dir) / Path(source).stem)
+
+    return BatchResult(
+        source=str(source),
+        file_hash=file_hash,
+        users=network.number_of_users(),
+        edges=network.number_of_edges(),
+        sampled_users=sample.number_of_users(),
+        communities=len(set(community_result.partition.values())),
+        modularity=community_result.modularity,
+        seconds=time.perf_counter() - started,
+    )
+
+
+def analyze_files(
+    sources: Sequence[str],
+    settings: BatchSettings = BatchSettings(),
+    snapshot_root: Path = snapshot.DEFAULT_SNAPSHOT_ROOT,
+    export_dir: Optional[Path] = None,
+    jobs: int = 1,
+) -> List[Optional[BatchResult]]:
+    """
+    `analyze_file` for every source on up to `jobs` processes, in the order given.
+    Files that fail are logged and give None.
+
+    Snapshots of other files are then evicted to stay within the snapshot size
+    budget; only once every job is done, so that no job removes the snapshots
+    another one is writing.
+    """
+    if jobs <= 1 or len(sources) <= 1:
+        results = [
+            _analyze_quietly(source, settings, snapshot_root, export_dir)
+            for source in sources
+        ]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(sources))) as executor:
+            futures = [
+                executor.submit(
+                    _analyze_quietly, source, settings, snapshot_root, export_dir
+                )
+                for source in sources
+            ]
+            results = [future.result() for future in futures]
+
+    analysed = [
+        snapshot.snapshot_path(snapshot_root, result.file_hash)
+        for result in results
+        if result is not None
+    ]
+    snapshot.evict_snapshots(snapshot_root, keep=analysed)
+    return results
+
+
+def export_tables(
+    network: UserNetwork, community_result: CommunityResult, directory: Path
+):
+    """
+    Write `metrics.parquet` (one row per user of `network`, one column per metric)
+    and `partition.parquet` (user and community of the users in the partition).
+
+    The batch analysis passes the sample, so only its users are exported.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    names = np.asarray(network.users.names[: network.number_of_users()], dtype=object)
+
+    metrics = {"user": pa.array(names, pa.string())}
+    for name, values in sorted(network.computed_metric_values().items()):
+        metrics[name] = pa.array(np.asarray(values.values))
+    pq.write_table(pa.table(metrics), directory / "metrics.parquet")
+
+    nodes = np.fromiter(community_result.partition.keys(), dtype=np.int64)
+    communities = np.fromiter(community_result.partition.values(), dtype=np.int64)
+    partition = pa.table(
+        {
+            "user": pa.array(names[nodes], pa.string()),
+            "community": pa.array(communities),
+        }
+    ).replace_schema_metadata(
+        {
+            "engine": community_result.engine,
+            "modularity": repr(community_result.modularity),
+        }
+    )
+    pq.write_table(partition, directory / "partition.parquet")
+
+
+def _detect_communities(
+    network: UserNetwork, path: Path, settings: BatchSettings
+) -> CommunityResult:
+    # The dashboard detects communities on the top-degree subgraph of the sample.
+    key = snapshot.partition_key(
+        settings.max_nodes, settings.algorithm, settings.params
+    )
+    result = snapshot.load_partition(path, key)
+    if result is None:
+        graph = network.top_degree_subgraph(settings.max_nodes)
+        result = network.run_community_detection(
+            graph, settings.algorithm, **settings.params
+        )
+        snapshot.save_partition(path, key, result)
+    return result
+
+
+def _analyze_quietly(
+    source, settings, snapshot_root, export_dir
+) -> Optional[BatchResult]:
+    try:
+        result = analyze_file(source, settings, snapshot_root, export_dir)
+    except Exception:
+        logger.exception("Analysis of %s failed", source)
+        return None
+    logger.info("Analysed %s in %.1f s", source, result.seconds)
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("sources", nargs="+", help="CSV files to analyse.")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Files analysed in parallel.",
+    )
+    parser.add_argument(
+        "--snapshot-dir", type=Path, default=snapshot.DEFAULT_SNAPSHOT_ROOT
+    )
+    parser.add_argument(
+        "--export-dir", type=Path, help="Also write Parquet tables here."
+    )
+    parser.add_argument("--max-nodes", type=int, default=BatchSettings.max_nodes)
+    parser.add_argument(
+        "--sampling-strategy",
+        choices=SamplingStrategy.list(),
+        default=BatchSettings.sampling_strategy,
+    )
+    parser.add_argument(
+        "--sampling-seed", type=int, default=BatchSettings.sampling_seed
+    )
+    parser.add_argument(
+        "--algorithm", choices=available_engines(), default=BatchSettings.algorithm
+    )
+    parser.add_argument(
+        "--resolution", type=float, default=1.0, help="Louvain and Leiden resolution."
+    )
+    parser.add_argument(
+        "--max-communities",
+        type=int,
+        default=5,
+        help="Girvan-Newman community cap.",
+    )
+    parser.add_argument(
+        "--time-limit",
+        type=float,
+        default=10.0,
+        help="Seconds for time-limited Louvain and Girvan-Newman.",
+    )
+    parser.add_argument(
+        "--centrality-mode",
+        choices=CentralityMode.list(),
+        default=BatchSettings.centrality_mode,
+    )
+    parser.add_argument(
+        "--centrality-samples", type=int, default=BatchSettings.centrality_samples
+    )
+    parser.add_argument(
+        "--centrality-workers", type=int, default=BatchSettings.centrality_workers
+    )
+    parser.add_argument(
+        "--metrics-backend",
+        choices=MetricsBackend.list(),
+        default=BatchSettings.metrics_backend,
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+    settings = BatchSettings(
+        max_nodes=args.max_nodes,
+        sampling_strategy=args.sampling_strategy,
+        sampling_seed=args.sampling_seed,
+        algorithm=args.algorithm,
+        params=_engine_params(args),
+        centrality_mode=args.centrality_mode,
+        centrality_samples=args.centrality_samples,
+        centrality_workers=args.centrality_workers,
+        metrics_backend=args.metrics_backend,
+    )
+    results = analyze_files(
+        args.sources, settings, args.snapshot_dir, args.export_dir, args.jobs
+    )
+    for result in results:
+        if result is not None:
+            print(asdict(result))
+    return 0 if all(result is not None for result in results) else 1
+
+
+def _engine_params(args: argparse.Namespace) -> Dict[str, Any]:
+    # Same parameters as the sidebar passes, so partition keys match the dashboard's.
+    params = {}
+    if args.algorithm in ("Louvain", "Time-limited Louvain", "Leiden"):
+        params["resolution"] = args.resolution
+    elif args.algorithm == "Girvan Newman":
+        params["max_communities"] = args.max_communities
+    if args.algorithm in ("Time-limited Louvain", "Girvan Newman"):
+        params["time_limit"] = args.time_limit
+    return params
+
+
+if __name__ == "__main__":
+    sys.exit(main())
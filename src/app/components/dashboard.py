@@ -1,32 +1,114 @@
-from collections import Counter
+import logging
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Optional, Tuple
 
-import matplotlib.pyplot as plt
 import pandas as pd
 import streamlit as st
-from wordcloud import WordCloud
 
-from src.app.presenter.presenter import NetworkPresenter
-from src.app.utils.constants import NodeSizeMetric
-from src.app.utils.utils import create_user_network
+from src.app.utils import profiling, snapshot
+from src.app.utils.cache import (
+    build_full_user_network,
+    build_user_network,
+    get_file_hash,
+    get_snapshot_path,
+    get_snapshot_rows_count,
+    get_token_frequencies,
+    get_user_row_index,
+    get_word_cloud,
+    has_network_snapshot,
+    load_dataframe,
+    load_network_snapshot,
+    start_dataset_profile,
+    stream_user_network,
+)
+from src.app.utils.constants import (
+    DEFAULT_CENTRALITY_SAMPLES,
+    DEFAULT_CENTRALITY_WORKERS,
+    DEFAULT_SEED,
+    JOB_POLL_INTERVAL,
+    TABLE_PAGE_SIZES,
+    CentralityMode,
+    MetricsBackend,
+    NodeSizeMetric,
+    NodeSizeScale,
+    RenderMode,
+    SamplingStrategy,
+)
+from src.app.utils.df_parser import is_dataframe_with_content
+from src.app.utils.jobs import Job, JobBoard
+
+if TYPE_CHECKING:
+    # The graph stack (NetworkX, SciPy, pyvis, community detection) is imported
+    # on first use of the graph view, so opening the app or exploring data does
+    # not pay for it.
+    from src.app.model import UserNetwork
+    from src.app.presenter.presenter import NetworkPresenter
+    from src.app.utils.community_engines import CommunityResult
+    from src.app.utils.metrics import CentralityOptions
+
+logger = logging.getLogger(__name__)
 
 
 class Dashboard:
     def __init__(self):
         self.df = None
+        self.file_hash = None
+        # Set when the network comes from streaming ingestion.
+        self.full_network = None
+        self.profile_future = None
+        self.profile = None
+        self.snapshot_path = None
         st.set_page_config(layout="wide")
         st.title("📊 Interactive Social Media Dashboard with Community Detection")
 
     def on_load_file(self):
-        self._load_data()
+        with profiling.stage("load_data"):
+            self._load_data()
 
     def on_display_graph(self):
-        self._init_network()
-        self._display_network()
-        self._display_community_stats()
-        self._display_graph_metrics()
+        with profiling.stage("init_network"):
+            self._init_network()
+
+        presenter = st.session_state.get("network_presenter")
+        if not presenter:
+            return
+
+        # Heavy stages run in the background; each section appears when its job is done.
+        jobs = st.session_state.setdefault("graph_jobs", JobBoard())
+        graph_job = self._submit_graph_job(jobs, presenter)
+        metrics_job = jobs.submit(
+            "metrics",
+            self._network_key(presenter),
+            _compute_metrics_table,
+            presenter,
+            self.snapshot_path,
+        )
+
+        self._show_when_done(
+            graph_job,
+            self._display_graph,
+            "Detecting communities and laying out the graph...",
+        )
+        self._show_when_done(
+            metrics_job, self._display_graph_metrics, "Computing centralities..."
+        )
 
     def on_display_exploration_view(self):
+        if self.df is None and self.file_hash and not st.session_state.get("streaming_mode"):
+            self._set_dataframe(
+                load_dataframe(self.file_hash, st.session_state["uploaded_file"])
+            )
+        if self.df is None:
+            st.info(
+                "Data exploration needs the full table and is not available "
+                "in streaming ingestion mode."
+            )
+            return
+
         self._show_data_sample()
+        with st.spinner("Profiling dataset..."):
+            self.profile = self.profile_future.result()
         self._show_data_description()
         self._show_data_columns_types()
         self._show_data_missing_values()
@@ -37,16 +119,15 @@ class Dashboard:
 
     def _show_data_description(self):
         st.subheader("Summary Statistics")
-        st.write(self.df.describe(include="all"))
+        st.write(self.profile.description)
 
     def _show_data_columns_types(self):
         st.subheader("Column Data Types")
-        st.write(self.df.dtypes)
+        st.write(self.profile.dtypes)
 
     def _show_data_missing_values(self):
         st.subheader("Missing Values Per Column")
-        missing = self.df.isnull().sum()
-        missing = missing[missing > 0]
+        missing = self.profile.missing_values
 
         if not missing.empty:
             st.bar_chart(missing)
@@ -55,49 +136,51 @@ class Dashboard:
 
     def _show_data_distribution(self):
         st.subheader("Top Users by Tweet Count")
-        st.bar_chart(self.df["name"].value_counts().head(10))
+        st.bar_chart(self.profile.top_users)
 
     def _show_tweet_frequency_over_time(self):
-        if "tweet_created" not in self.df.columns:
+        if self.profile.tweets_per_day is None:
             return
 
-        self.df["tweet_created"] = pd.to_datetime(self.df["tweet_created"])
-        time_series = self.df.groupby(self.df["tweet_created"].dt.date).size()
-
         st.subheader("Tweet Frequency Over Time")
-        st.line_chart(time_series)
+        st.line_chart(self.profile.tweets_per_day)
 
-    def _show_text_analysis(self, starts_with: str = "#"):
+    def _show_text_analysis(self, starts_with: str = "#", top_n: int = 50):
         st.subheader("Most Common Words in Tweets")
-        text_data = " ".join(self.df["text"].dropna())
-        word_freq = Counter(text_data.lower().split())
-
-        filtered_freq = {
-            word: freq
-            for word, freq in word_freq.items()
-            if word.startswith(starts_with)
-        }
-
-        common_words = dict(Counter(filtered_freq).most_common(50))
+        if not is_dataframe_with_content(self.df):
+            return
 
-        wordcloud = WordCloud(width=800, height=400).generate_from_frequencies(
-            common_words
-        )
+        frequencies = get_token_frequencies(self.file_hash, starts_with, self.df)
+        if frequencies.empty:
+            st.info(f"No words starting with '{starts_with}' found.")
+            return
 
-        fig, ax = plt.subplots()
-        ax.imshow(wordcloud, interpolation="bilinear")
-        ax.axis("off")
-        st.pyplot(fig)
+        st.image(get_word_cloud(self.file_hash, starts_with, top_n, self.df))
 
     def _let_filter_data(self):
         st.subheader("Filter by User")
-        users = st.multiselect("Select users", options=self.df["name"].unique())
+        row_index = get_user_row_index(self.file_hash, self.df)
+        users = st.multiselect("Select users", options=row_index.users)
 
-        filtered_df = self.df
-        if users:
-            filtered_df = filtered_df[filtered_df["name"].isin(users)]
+        rows = row_index.get_rows(users) if users else None
+        total = len(self.df) if rows is None else len(rows)
 
-        st.dataframe(filtered_df, use_container_width=True)
+        page_size_col, page_col = st.columns(2)
+        page_size = page_size_col.selectbox("Rows per page", TABLE_PAGE_SIZES, index=1)
+        pages_count = max(1, -(-total // page_size))
+        page = page_col.number_input(
+            f"Page (of {pages_count})", min_value=1, max_value=pages_count, value=1
+        )
+
+        start = (page - 1) * page_size
+        stop = min(start + page_size, total)
+        if rows is None:
+            page_df = self.df.iloc[start:stop]
+        else:
+            page_df = self.df.iloc[rows[start:stop]]
+
+        st.dataframe(page_df, use_container_width=True)
+        st.caption(f"Rows {min(start + 1, total)}–{stop} of {total}")
 
     def _load_data(self):
         uploaded_file = st.session_state.get("uploaded_file")
@@ -107,7 +190,18 @@ class Dashboard:
             return
 
         try:
-            df = pd.read_csv(uploaded_file)
+            file_hash = get_file_hash(uploaded_file)
+            df = None
+            # Analysed before: the graph view opens the saved network and the table
+            # is only read if the exploration view needs it.
+            rows_count = get_snapshot_rows_count(file_hash)
+            if rows_count is None and st.session_state.get("streaming_mode"):
+                self.full_network, rows_count = self._stream_network(
+                    file_hash, uploaded_file
+                )
+            elif rows_count is None:
+                df = load_dataframe(file_hash, uploaded_file)
+                rows_count = len(df)
         except (FileNotFoundError, OSError, pd.errors.EmptyDataError) as e:
             st.error(f"File not found or invalid file: {e}")
             return
@@ -115,87 +209,202 @@ class Dashboard:
             st.error(f"An error occurred while loading the file: {e}")
             return
 
+        st.session_state["rows_count"] = rows_count
+        st.success(f"Loaded {rows_count} tweets!")
+        self.file_hash = file_hash
+        self._set_dataframe(df)
+
+    def _set_dataframe(self, df: Optional[pd.DataFrame]):
+        if df is not None:
+            self.profile_future = start_dataset_profile(self.file_hash, df)
         st.session_state["dataframe"] = df
-        st.success(f"Loaded {len(df)} tweets!")
         self.df = df
 
+    def _stream_network(self, file_hash: str, uploaded_file):
+        progress = st.progress(0.0, text="Reading CSV in chunks...")
+
+        def on_progress(rows_count: int, fraction: float):
+            progress.progress(fraction, text=f"Read {rows_count} rows...")
+
+        result = stream_user_network(
+            file_hash, st.session_state["chunk_size"], uploaded_file, on_progress
+        )
+        progress.empty()
+        return result
+
     def _show_data_sample(self):
         if self.df is not None:
             st.subheader("Raw Data Sample")
             st.dataframe(self.df.head())
 
     def _init_network(self):
-        if self.df is not None and "max_nodes" in st.session_state:
-            df = self.df.sample(st.session_state["max_nodes"])
-            user_network = create_user_network(df)
-            presenter = NetworkPresenter(user_network)
+        from src.app.presenter.presenter import NetworkPresenter
 
-            metric_name = st.session_state.get(
-                "node_size_metric", NodeSizeMetric.DEGREE
-            )
-            presenter.set_metric(metric_name)
+        if "max_nodes" not in st.session_state:
+            return
+        if self.full_network is not None:
+            full_network = self.full_network
+        elif self.file_hash and has_network_snapshot(self.file_hash):
+            full_network = load_network_snapshot(self.file_hash)
+        elif self.df is not None:
+            full_network = build_full_user_network(self.file_hash, self.df)
+        else:
+            return
 
-            st.session_state["network_presenter"] = presenter
+        sample = (
+            st.session_state["max_nodes"],
+            st.session_state.get("sampling_strategy", SamplingStrategy.TOP_DEGREE_EGO),
+            st.session_state.get("sampling_seed", DEFAULT_SEED),
+        )
+        user_network = build_user_network(self.file_hash, *sample, full_network)
+        self.snapshot_path = get_snapshot_path(self.file_hash, *sample)
+
+        # The network is shared by all sessions, so this session's options stay in
+        # its presenter.
+        centrality_options = self._get_centrality_options(user_network)
+        snapshot.load_metrics(user_network, self.snapshot_path, centrality_options)
+        presenter = NetworkPresenter(
+            user_network, centrality_options=centrality_options
+        )
 
-    def _display_network(self):
-        presenter = st.session_state.get("network_presenter")
-        if presenter:
-            graph_html = presenter.visualize_network(
-                top_neighbours_nodes=st.session_state["max_nodes"],
-                algorithm=st.session_state["community_algorithm"],
-                params=st.session_state["community_params"],
-            )
-            st.components.v1.html(graph_html, height=600, scrolling=False)
+        metric_name = st.session_state.get("node_size_metric", NodeSizeMetric.DEGREE)
+        presenter.set_metric(
+            metric_name, st.session_state.get("node_size_scale", NodeSizeScale.LINEAR)
+        )
 
-    def _display_graph_metrics(self):
-        presenter = st.session_state.get("network_presenter")
-        if presenter:
-            network = presenter.user_network
-            stats = network.get_network_graph_stats()
-            users = [node for node in network.graph.nodes()]
-
-            data = []
-            for user in users:
-                data.append(
-                    {
-                        "User": user.name,
-                        "Degree Centrality": round(
-                            stats["degree_centrality"].get(user, 0), 4
-                        ),
-                        "Closeness Centrality": round(
-                            stats["closeness_centrality"].get(user, 0), 4
-                        ),
-                        "Betweenness Centrality": round(
-                            stats["betweenness_centrality"].get(user, 0), 4
-                        ),
-                        "Triads": stats["triadic_closure"].get(user, 0),
-                        "Clustering Coefficient": round(
-                            stats["clustering_coefficient"].get(user, 0), 4
-                        ),
-                    }
-                )
+        st.session_state["network_presenter"] = presenter
+
+    def _get_centrality_options(self, user_network: "UserNetwork") -> "CentralityOptions":
+        from src.app.utils.metrics import CentralityOptions
+
+        return CentralityOptions.for_mode(
+            st.session_state.get("centrality_mode", CentralityMode.AUTO),
+            user_network.number_of_users(),
+            samples=st.session_state.get(
+                "centrality_samples", DEFAULT_CENTRALITY_SAMPLES
+            ),
+            seed=DEFAULT_SEED,
+            workers=st.session_state.get(
+                "centrality_workers", DEFAULT_CENTRALITY_WORKERS
+            ),
+            backend=st.session_state.get("metrics_backend", MetricsBackend.SPARSE),
+        )
 
-            df = pd.DataFrame(data)
-            df = df.sort_values("Degree Centrality", ascending=False)
+    def _submit_graph_job(self, jobs: JobBoard, presenter: "NetworkPresenter") -> Job:
+        settings = dict(
+            top_neighbours_nodes=st.session_state["max_nodes"],
+            algorithm=st.session_state["community_algorithm"],
+            params=st.session_state["community_params"],
+            render_mode=st.session_state.get("render_mode", RenderMode.AUTO),
+        )
+        key = (
+            self._network_key(presenter),
+            st.session_state.get("node_size_metric"),
+            st.session_state.get("node_size_scale"),
+            tuple(sorted(settings["params"].items())),
+            *(value for name, value in settings.items() if name != "params"),
+        )
+        return jobs.submit(
+            "graph", key, _render_graph, presenter, self.snapshot_path, **settings
+        )
 
-            st.subheader("User Network Metrics")
-            st.dataframe(df, use_container_width=True)
+    @staticmethod
+    def _network_key(presenter: "NetworkPresenter") -> tuple:
+        network = presenter.user_network
+        return network, network.version, presenter.centrality_options
+
+    @staticmethod
+    def _show_when_done(job: Job, show: Callable[[Any], None], waiting_message: str):
+        """Call `show` with the job result, polling in a fragment until the job is done."""
+        waiting = not job.done()
+
+        @st.fragment(run_every=JOB_POLL_INTERVAL if waiting else None)
+        def section():
+            if not job.done():
+                st.info(waiting_message, icon="⏳")
+            elif waiting:
+                # Rerun the whole page so the finished section stops polling.
+                st.rerun()
+            else:
+                profiling.extend(job.timings, prefix="background ")
+                show(job.result())
+
+        section()
+
+    def _display_graph(self, rendered_graph: Tuple[str, "CommunityResult"]):
+        graph_html, community_result = rendered_graph
+        with profiling.stage("display_network"):
+            st.components.v1.html(graph_html, height=600, scrolling=False)
+        with profiling.stage("display_community_stats"):
+            self._display_community_stats(community_result)
+
+    def _display_graph_metrics(self, metrics: Tuple[pd.DataFrame, "CentralityOptions"]):
+        df, centrality_options = metrics
+        st.subheader("User Network Metrics")
+        st.caption(
+            "Closeness and betweenness centrality: " + centrality_options.describe()
+        )
+        st.dataframe(df, use_container_width=True)
 
-    def _display_community_stats(self):
-        presenter = st.session_state.get("network_presenter")
-        if presenter:
-            partition = presenter.partition
-            st.subheader("Detected Communities")
-            communities_count = {}
-            for _, community_id in partition.items():
-                communities_count[community_id] = (
-                    communities_count.get(community_id, 0) + 1
-                )
+    def _display_community_stats(self, result: "CommunityResult"):
+        st.subheader("Detected Communities")
+        st.caption(
+            f"{result.engine}: modularity {result.modularity:.4f}, "
+            f"computed in {result.runtime:.2f}s"
+        )
+        communities_count = {}
+        for _, community_id in result.partition.items():
+            communities_count[community_id] = communities_count.get(community_id, 0) + 1
 
-            community_df = pd.DataFrame.from_dict(
-                communities_count, orient="index", columns=["Nodes in Community"]
-            )
-            community_df.index.name = "Community ID"
-            st.dataframe(
-                community_df.sort_values("Nodes in Community", ascending=False)
-            )
+        community_df = pd.DataFrame.from_dict(
+            communities_count, orient="index", columns=["Nodes in Community"]
+        )
+        community_df.index.name = "Community ID"
+        st.dataframe(community_df.sort_values("Nodes in Community", ascending=False))
+
+
+def _render_graph(
+    presenter: "NetworkPresenter",
+    snapshot_path: Path,
+    cancelled: threading.Event,
+    **settings,
+) -> Tuple[str, "CommunityResult"]:
+    """
+    Background job: community detection and graph HTML for the current settings.
+
+    Partitions are saved in the network snapshot and reused for the same settings.
+    """
+    partition_key = snapshot.partition_key(
+        settings["top_neighbours_nodes"], settings["algorithm"], settings["params"]
+    )
+    saved_result = snapshot.load_partition(snapshot_path, partition_key)
+    graph_html = presenter.visualize_network(
+        **settings, community_result=saved_result, cancelled=cancelled
+    )
+    if saved_result is None:
+        _save_quietly(
+            snapshot.save_partition, snapshot_path, partition_key, presenter.community_result
+        )
+    return graph_html, presenter.community_result
+
+
+def _compute_metrics_table(
+    presenter: "NetworkPresenter", snapshot_path: Path, cancelled: threading.Event
+) -> Tuple[pd.DataFrame, "CentralityOptions"]:
+    """Background job: the metrics table; computed metrics are saved in the network snapshot."""
+    metrics = presenter.get_metrics_table(cancelled)
+    _save_quietly(
+        snapshot.save_metrics,
+        presenter.user_network,
+        snapshot_path,
+        presenter.centrality_options,
+    )
+    return metrics
+
+
+def _save_quietly(save: Callable, *args):
+    # Snapshots only speed up later sessions, so a failed write is not an error.
+    try:
+        save(*args)
+    except OSError as e:
+        logger.warning("Could not update snapshot: %s", e)
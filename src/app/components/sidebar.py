@@ -1,5 +1,21 @@
+import os
+
+import pandas as pd
 import streamlit as st
 
+from src.app.utils import profiling
+from src.app.utils.constants import (
+    DEFAULT_CENTRALITY_SAMPLES,
+    DEFAULT_CENTRALITY_WORKERS,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_SEED,
+    CentralityMode,
+    MetricsBackend,
+    NodeSizeScale,
+    RenderMode,
+    SamplingStrategy,
+)
+
 
 class Sidebar:
     def __init__(self, on_load_file, on_display_graph, on_display_exploration_view):
@@ -8,9 +24,12 @@ class Sidebar:
         self.on_load_file = on_load_file
         self.on_display_graph = on_display_graph
         self.on_display_exploration_view = on_display_exploration_view
+        # The toggle is drawn last but has to take effect before anything runs.
+        profiling.reset(st.session_state.get("show_performance", False))
         self.get_file()
         self.get_view_selector()
         self.display_configure()
+        self.display_performance()
 
     def get_file(self):
         uploaded_file = st.sidebar.file_uploader("Upload Tweet CSV", type=["csv"])
@@ -20,6 +39,21 @@ class Sidebar:
             st.session_state["uploaded_file"] = "data/Tweets.csv"
             st.warning("No file uploaded yet. Used default one.")
 
+        streaming_mode = st.sidebar.checkbox(
+            "Streaming ingestion (large files)",
+            help="Read the CSV in chunks and build the network incrementally. "
+            "Only the columns needed for the graph are kept in memory.",
+        )
+        st.session_state["streaming_mode"] = streaming_mode
+        if streaming_mode:
+            st.session_state["chunk_size"] = st.sidebar.number_input(
+                "Rows per chunk",
+                min_value=1_000,
+                max_value=1_000_000,
+                value=DEFAULT_CHUNK_SIZE,
+                step=10_000,
+            )
+
         self.on_load_file()
 
     def get_view_selector(self):
@@ -34,8 +68,11 @@ class Sidebar:
             self.display_configure_graph()
 
     def display_configure_graph(self):
-        if "dataframe" in st.session_state:
-            nodes_count = len(st.session_state["dataframe"])
+        # Loads the community detection libraries, so only once the graph view is open.
+        from src.app.utils.community_engines import available_engines
+
+        if "rows_count" in st.session_state:
+            nodes_count = st.session_state["rows_count"]
             st.sidebar.subheader("Graph Configuration")
             max_nodes = st.sidebar.number_input(
                 "Number of nodes for the graph (Enter below the total rows in data)",
@@ -44,16 +81,25 @@ class Sidebar:
                 value=st.session_state.get("max_nodes", min(100, nodes_count)),
                 step=1,
             )
+            st.session_state["sampling_strategy"] = st.sidebar.selectbox(
+                "Sampling strategy",
+                options=SamplingStrategy.list(),
+                index=0,
+                help="How users are picked when the network has more users than "
+                "the graph shows. Samples are reproducible for a given seed.",
+            )
+            st.session_state["sampling_seed"] = st.sidebar.number_input(
+                "Sampling seed", min_value=0, value=DEFAULT_SEED, step=1
+            )
 
             algorithm = st.sidebar.selectbox(
-                "Select community detection algorithm",
-                ["Louvain", "Label Propagation", "Girvan Newman"],
+                "Select community detection algorithm", available_engines()
             )
             algo_params = {}
 
-            if algorithm == "Louvain":
+            if algorithm in ("Louvain", "Time-limited Louvain", "Leiden"):
                 resolution = st.sidebar.number_input(
-                    "Resolution (Louvain)",
+                    f"Resolution ({algorithm})",
                     value=1.0,
                     min_value=0.1,
                     max_value=5.0,
@@ -74,6 +120,16 @@ class Sidebar:
             elif algorithm == "Label Propagation":
                 st.sidebar.info("No extra parameters for Label Propagation.")
 
+            if algorithm in ("Time-limited Louvain", "Girvan Newman"):
+                algo_params["time_limit"] = st.sidebar.number_input(
+                    f"Time limit in seconds ({algorithm})",
+                    value=10.0,
+                    min_value=0.5,
+                    max_value=600.0,
+                    step=0.5,
+                    help="The last level finished within the limit is used.",
+                )
+
             st.session_state["community_algorithm"] = algorithm
             st.session_state["community_params"] = algo_params
             st.session_state["max_nodes"] = max_nodes
@@ -84,8 +140,95 @@ class Sidebar:
                 index=0,
             )
             st.session_state["node_size_metric"] = metric
+            st.session_state["node_size_scale"] = st.sidebar.selectbox(
+                "Node size scaling",
+                options=NodeSizeScale.list(),
+                index=0,
+                help="Logarithmic and quantile scaling keep hubs from dwarfing "
+                "every other node in heavy-tailed networks.",
+            )
+
+            st.session_state["render_mode"] = st.sidebar.selectbox(
+                "Graph renderer",
+                options=RenderMode.list(),
+                index=0,
+                help="Auto uses the WebGL renderer with a precomputed layout "
+                "for graphs with many edges.",
+            )
+
+            centrality_mode = st.sidebar.selectbox(
+                "Closeness / betweenness computation",
+                options=CentralityMode.list(),
+                index=0,
+                help="Auto switches to sampled estimates on large graphs.",
+            )
+            st.session_state["centrality_mode"] = centrality_mode
+            if centrality_mode != CentralityMode.EXACT:
+                st.session_state["centrality_samples"] = st.sidebar.number_input(
+                    "Sampled sources (approximate mode)",
+                    min_value=10,
+                    max_value=5000,
+                    value=DEFAULT_CENTRALITY_SAMPLES,
+                    step=10,
+                )
+            st.session_state["metrics_backend"] = st.sidebar.selectbox(
+                "PageRank / triangles / clustering backend",
+                options=MetricsBackend.list(),
+                index=0,
+                help="Sparse matrices compute these metrics with vectorized SciPy "
+                "operations; both backends give the same values.",
+            )
+            cpu_count = os.cpu_count() or 1
+            st.session_state["centrality_workers"] = st.sidebar.number_input(
+                "CPU workers (closeness / betweenness)",
+                min_value=1,
+                max_value=max(cpu_count, DEFAULT_CENTRALITY_WORKERS),
+                value=DEFAULT_CENTRALITY_WORKERS,
+                step=1,
+                help="Processes sharing the shortest-path searches. "
+                "Results are identical for any number of workers.",
+            )
 
             self.on_display_graph()
 
     def display_configure_exploration(self):
         self.on_display_exploration_view()
+
+    def display_performance(self):
+        st.sidebar.checkbox(
+            "Performance panel",
+            key="show_performance",
+            help="Time every stage of this rerun. Cached stages show up as near zero.",
+        )
+        if not profiling.is_enabled():
+            return
+
+        timings = profiling.get_timings()
+        profiling.log_timings(timings)
+        with st.sidebar.expander("Performance", expanded=True):
+            if not timings:
+                st.write("No stages recorded in this rerun.")
+                return
+            st.dataframe(
+                pd.DataFrame(
+                    {
+                        "Stage": [
+                            "\u00a0\u00a0" * timing.depth + timing.stage
+                            for timing in timings
+                        ],
+                        "Time (s)": [round(timing.seconds, 3) for timing in timings],
+                        "Peak RSS +MB": [
+                            round(timing.peak_rss_growth_mb, 1) for timing in timings
+                        ],
+                    }
+                ),
+                hide_index=True,
+                use_container_width=True,
+            )
+            st.caption(f"Rerun total: {profiling.elapsed():.3f} s")
+            st.download_button(
+                "Download as JSON lines",
+                profiling.to_json_lines(timings),
+                file_name="ismd_profile.jsonl",
+                mime="application/json",
+            )
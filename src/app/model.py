@@ -1,10 +1,22 @@
-import re
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from functools import reduce
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
 
-import community as community_louvain
 import networkx as nx
-from networkx.algorithms.community import girvan_newman, label_propagation_communities
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from src.app.utils import profiling
+from src.app.utils.metrics import CentralityOptions, GraphStats, MetricValues
+from src.app.utils.text_entities import TextEntities, find_mentions
+
+if TYPE_CHECKING:
+    # python-louvain and the NetworkX community algorithms are only imported
+    # when communities are first detected.
+    from src.app.utils.community_engines import CommunityResult
 
 
 class User:
@@ -27,73 +39,436 @@ class Tweet:
         self.username = username
 
     def find_mentioned_users(self):
-        return re.findall(r"@(\w+)", self.content)
+        return find_mentions(self.content)
 
 
 class Interaction:
-    def __init__(self, user1: User, user2: User, tweet: Tweet = None):
+    def __init__(
+        self,
+        user1: User,
+        user2: User,
+        tweet: Optional[Tweet] = None,
+        interaction_type: str = "mention",
+        timestamp: Any = None,
+        row: Optional[int] = None,
+    ):
         self.user1 = user1
         self.user2 = user2
         self.tweet = tweet
+        self.interaction_type = interaction_type
+        self.timestamp = timestamp
+        # Row index of the source tweet in the loaded DataFrame, kept on the edge.
+        self.row = row
+
+    def __key(self):
+        return (
+            self.user1,
+            self.user2,
+            self.tweet,
+            self.interaction_type,
+            self.timestamp,
+            self.row,
+        )
+
+    def __hash__(self):
+        return hash(self.__key())
+
+    def __eq__(self, other):
+        return isinstance(other, Interaction) and self.__key() == other.__key()
+
+
+class UserIndex:
+    """Interned table mapping usernames to dense integer ids (0, 1, 2, ...)."""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name: str):
+        return name in self._ids
+
+    def get_id(self, name: str) -> int:
+        return self._ids[name]
+
+    def get_name(self, user_id: int) -> str:
+        return self.names[user_id]
+
+    def intern(self, name: str) -> int:
+        user_id = self._ids.get(name)
+        if user_id is None:
+            user_id = self._ids[name] = len(self.names)
+            self.names.append(name)
+        return user_id
+
+    def intern_many(self, names: Iterable[str]) -> np.ndarray:
+        """Vectorized `intern`: only distinct names go through the Python dict."""
+        if not isinstance(names, np.ndarray):
+            names = np.asarray(list(names), dtype=object)
+        codes, uniques = pd.factorize(names)
+        ids = np.fromiter(
+            (self.intern(name) for name in uniques), dtype=np.int64, count=len(uniques)
+        )
+        return ids[codes]
 
 
 class UserNetwork:
+    """
+    Undirected user graph with one aggregated edge per pair of users.
+
+    Users are interned into dense integer ids (see `users`) and edges are kept in a
+    columnar table with one row per user pair:
+        - "source" / "target": user ids, with source <= target,
+        - "weight": number of interactions between the two users,
+        - "interaction_types": interaction count per interaction type,
+        - "first_timestamp" / "last_timestamp": time span of the interactions (NaT if unknown),
+        - "tweets": row indices of the tweets behind the interactions.
+    In networks opened from a snapshot, "interaction_types" and "tweets" stay
+    Arrow-backed (`pd.ArrowDtype`) until edges are merged into existing ones.
+
+    Degree and neighbour queries run on CSR adjacency arrays. The NetworkX view in
+    `graph` (integer nodes, "weight" edge attribute) is only built when accessed and
+    is rebuilt lazily after the network changes.
+    """
+
     def __init__(self, users: List[User], interactions: List[Interaction] = None):
-        self.graph = nx.Graph()
-        self.__init_graph(users, interactions)
+        self.users = UserIndex()
+        self._edges = _empty_edge_table()
+        self._version = 0
+        self._graph: Optional[nx.Graph] = None
+        self._graph_version = -1
+        self._csr = None
+        self._csr_version = -1
+        # Graph stats and metric arrays of the current version, per centrality options.
+        self._stats: OrderedDict[CentralityOptions, GraphStats] = OrderedDict()
+        self._stats_version = -1
+        self._degrees = np.zeros(0, dtype=np.int64)
+        self._max_degree = 0
+        self._subgraphs: OrderedDict[int, nx.Graph] = OrderedDict()
+        self._subgraphs_version = -1
+        self._metric_values: Dict[CentralityOptions, Dict[str, MetricValues]] = {}
+        self._metric_values_version = -1
+        self._last_partition: Optional[Dict[int, int]] = None
+        # Guards the lazily built views and caches above: the graph view and the
+        # metrics table are computed on different threads from the same network.
+        self._lock = threading.RLock()
+        # Used when no options are passed; the dashboard passes its own per session.
+        self.centrality_options = CentralityOptions()
+        # One past the highest row index seen, so appended batches get fresh row ids.
+        self.rows_count = 0
+        self.__init_graph(users, interactions or [])
+
+    @classmethod
+    def from_edge_list(
+        cls, usernames: Iterable[str], edges: Iterable[tuple[str, str, dict]]
+    ) -> "UserNetwork":
+        """
+        Build a network from (source, target, edge attributes) username triples.
+
+        Edges that appear more than once are merged into one aggregated edge.
+        """
+        network = cls([])
+        network.add_edges(usernames, edges)
+        return network
+
+    @classmethod
+    def from_edge_table(cls, usernames: Iterable[str], edges: pd.DataFrame) -> "UserNetwork":
+        """
+        Rebuild a network from its usernames (in id order) and an id-based edge
+        table as returned by `edge_table(usernames=False)`, e.g. from a snapshot.
+        """
+        network = cls([])
+        network.users.intern_many(usernames)
+        batch = edges[_EDGE_COLUMNS]
+        batch.index = _edge_keys(batch["source"], batch["target"])
+        network._merge_edge_batch(batch)
+        network._version += 1
+        return network
+
+    @property
+    def graph(self) -> nx.Graph:
+        """NetworkX view of the network, built on demand from the edge table."""
+        with self._lock:
+            if self._graph is None or self._graph_version != self._version:
+                graph = nx.Graph()
+                graph.add_nodes_from(range(len(self.users)))
+                graph.add_weighted_edges_from(
+                    zip(
+                        self._edges["source"].tolist(),
+                        self._edges["target"].tolist(),
+                        self._edges["weight"].tolist(),
+                    )
+                )
+                self._graph = graph
+                self._graph_version = self._version
+            return self._graph
+
+    @property
+    def adjacency(self) -> sp.csr_array:
+        """Symmetric weighted CSR adjacency matrix indexed by user id."""
+        with self._lock:
+            if self._csr is None or self._csr_version != self._version:
+                n = len(self.users)
+                sources = self._edges["source"].to_numpy()
+                targets = self._edges["target"].to_numpy()
+                weights = self._edges["weight"].to_numpy(dtype=np.float64)
+                off_diagonal = sources != targets
+                rows = np.concatenate([sources, targets[off_diagonal]])
+                cols = np.concatenate([targets, sources[off_diagonal]])
+                data = np.concatenate([weights, weights[off_diagonal]])
+                self._csr = sp.csr_array((data, (rows, cols)), shape=(n, n))
+                self._csr_version = self._version
+            return self._csr
+
+    @property
+    def version(self) -> int:
+        """Counter that changes whenever the network changes."""
+        return self._version
+
+    def number_of_users(self) -> int:
+        return len(self.users)
+
+    def number_of_edges(self) -> int:
+        return len(self._edges)
+
+    def get_username(self, user_id: int) -> str:
+        return self.users.get_name(user_id)
+
+    def get_usernames(self, user_ids: Iterable[int]) -> List[str]:
+        names = self.users.names
+        return [names[user_id] for user_id in user_ids]
+
+    def degrees(self) -> np.ndarray:
+        """
+        Degree of every user, indexed by id; self-loops count twice as in NetworkX.
+
+        The array is maintained incrementally as edges are added and must not be
+        modified by callers.
+        """
+        return self._degrees
+
+    def top_degree_users(self, k: int) -> np.ndarray:
+        """
+        Ids of the `k` users with the highest degree, best connected first; ties go
+        to the lower id. Uses a partial sort, O(n + k log k), instead of sorting all users.
+        """
+        degrees = self._degrees
+        k = min(k, len(degrees))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+
+        threshold = np.partition(degrees, len(degrees) - k)[len(degrees) - k]
+        above = np.flatnonzero(degrees > threshold)
+        ties = np.flatnonzero(degrees == threshold)[: k - len(above)]
+        top = np.concatenate([above, ties])
+        return top[np.lexsort((top, -degrees[top]))]
+
+    def top_degree_subgraph(self, k: int) -> nx.Graph:
+        """
+        View of `graph` restricted to the `k` best connected users and their neighbours.
+
+        Subgraphs are cached per `k` until the network changes.
+        """
+        with self._lock:
+            if self._subgraphs_version != self._version:
+                self._subgraphs.clear()
+                self._subgraphs_version = self._version
+
+            subgraph = self._subgraphs.get(k)
+            if subgraph is None:
+                top = self.top_degree_users(k)
+                csr = self.adjacency
+                neighbours = csr[top].indices if len(top) else top
+                nodes = np.union1d(top, neighbours)
+                subgraph = self._subgraphs[k] = self.graph.subgraph(nodes.tolist())
+                if len(self._subgraphs) > _MAX_CACHED_SUBGRAPHS:
+                    self._subgraphs.popitem(last=False)
+            else:
+                self._subgraphs.move_to_end(k)
+            return subgraph
+
+    def neighbors(self, user_id: int) -> np.ndarray:
+        csr = self.adjacency
+        return csr.indices[csr.indptr[user_id] : csr.indptr[user_id + 1]]
+
+    def edge_table(self, usernames: bool = True) -> pd.DataFrame:
+        """
+        Aggregated edges with usernames (or user ids) in "source" / "target".
+
+        "interaction_types" holds dicts and "tweets" lists, also for a network
+        loaded from a snapshot, which keeps them in Arrow buffers until needed.
+        """
+        edges = _with_python_values(self._edges)
+        if not usernames:
+            return edges.reset_index(drop=True)
+
+        names = np.asarray(self.users.names, dtype=object)
+        return edges.assign(
+            source=names[self._edges["source"].to_numpy()],
+            target=names[self._edges["target"].to_numpy()],
+        ).reset_index(drop=True)
+
+    def subnetwork(self, user_ids: Iterable[int]) -> "UserNetwork":
+        """
+        Network induced by `user_ids`: those users and every aggregated edge between them.
+
+        Users are renumbered in increasing order of their id in this network.
+        """
+        user_ids = np.unique(np.fromiter(user_ids, dtype=np.int64))
+        selected = np.zeros(len(self.users), dtype=bool)
+        selected[user_ids] = True
+        sources = self._edges["source"].to_numpy()
+        targets = self._edges["target"].to_numpy()
+        edges = self._edges[selected[sources] & selected[targets]]
+
+        names = np.asarray(self.users.names, dtype=object)
+        network = UserNetwork([])
+        network.add_edge_frame(
+            names[user_ids],
+            edges.assign(
+                source=names[edges["source"].to_numpy()],
+                target=names[edges["target"].to_numpy()],
+            ),
+        )
+        network.rows_count = self.rows_count
+        network.centrality_options = self.centrality_options
+        return network
+
+    def add_edges(
+        self, usernames: Iterable[str], edges: Iterable[tuple[str, str, dict]]
+    ):
+        """
+        Fold (source, target, edge attributes) username triples into the network.
+
+        Edges between users that are already connected are merged with the
+        existing aggregates; `usernames` are added as nodes even without edges.
+        """
+        records = [dict(attrs, source=source, target=target) for source, target, attrs in edges]
+        self.add_edge_frame(usernames, pd.DataFrame(records, columns=_EDGE_COLUMNS))
+
+    def add_interactions(
+        self,
+        batch: pd.DataFrame,
+        reindex: bool = True,
+        entities: Optional[TextEntities] = None,
+    ):
+        """
+        Append a batch of rows in either supported schema (tweets with "name" and
+        "text", or who/to_whom interactions) without touching earlier rows.
+
+        Edge weights, degrees and degree bounds are updated in place; metrics that
+        depend on the whole graph are recomputed lazily on next access. Louvain can
+        warm-start from the previous partition through
+        `run_community_detection(..., warm_start=True)`.
+
+        With `reindex`, the batch rows are numbered after the rows seen so far so
+        that edge tweet references stay unique; otherwise the batch index is used.
+        `entities` are the text entities of the batch, when already extracted.
+        """
+        # Imported here because df_parser depends on this module.
+        from src.app.utils import df_parser
+
+        if reindex:
+            batch = batch.set_axis(
+                pd.RangeIndex(self.rows_count, self.rows_count + len(batch))
+            )
+        usernames, edges = df_parser.get_network_edges(batch, entities)
+        self.add_edge_frame(usernames, df_parser.aggregate_edges(edges))
+        if len(batch):
+            self.rows_count = max(self.rows_count, int(batch.index.max()) + 1)
+
+    def add_edge_frame(self, usernames: Iterable[str], edges: pd.DataFrame):
+        """
+        Vectorized `add_edges` for a frame with username "source" / "target" columns
+        and the edge attribute columns (as produced by `df_parser.aggregate_edges`).
+        """
+        with self._lock:
+            self.users.intern_many(usernames)
+            sources = self.users.intern_many(edges["source"].to_numpy(dtype=object))
+            targets = self.users.intern_many(edges["target"].to_numpy(dtype=object))
+
+            batch = pd.DataFrame(
+                {
+                    "source": np.minimum(sources, targets),
+                    "target": np.maximum(sources, targets),
+                    "weight": edges["weight"].to_numpy(dtype=np.int64),
+                    "interaction_types": _edge_values(edges["interaction_types"]),
+                    "first_timestamp": _as_datetime(edges["first_timestamp"]),
+                    "last_timestamp": _as_datetime(edges["last_timestamp"]),
+                    "tweets": _edge_values(edges["tweets"]),
+                }
+            )
+            batch.index = _edge_keys(batch["source"], batch["target"])
+            if not batch.index.is_unique:
+                batch = _collapse_duplicate_edges(_with_python_values(batch))
+
+            self._merge_edge_batch(batch)
+            self._version += 1
 
     def get_min_degree(self):
-        return min(dict(self.graph.degree()).values())
+        return int(self._degrees.min())
 
     def get_max_degree(self):
-        return max(dict(self.graph.degree()).values())
+        return self._max_degree
 
     def detect_communities(
         self, graph: nx.Graph, method: str = "louvain", **kwargs
     ) -> Dict[Any, int]:
+        return self.run_community_detection(graph, method, **kwargs).partition
+
+    def run_community_detection(
+        self, graph: nx.Graph, method: str = "louvain", warm_start: bool = False, **kwargs
+    ) -> "CommunityResult":
+        """
+        Detect communities with a registered engine, see `community_engines`.
+
+        With `warm_start`, Louvain starts from the partition of the previous run
+        (extended to nodes added since), which converges much faster after an
+        incremental update.
+        """
+        from src.app.utils.community_engines import run_engine
 
-        method = method.lower()
+        if (
+            warm_start
+            and method.lower() == "louvain"
+            and self._last_partition is not None
+            and kwargs.get("partition") is None
+        ):
+            kwargs["partition"] = self.warm_start_partition(self._last_partition, graph)
 
-        if method == "louvain":
-            return community_louvain.best_partition(
-                graph,
-                partition=kwargs.get("partition", None),
-                weight=kwargs.get("weight", "weight"),
-                resolution=kwargs.get("resolution", 1.0),
-                randomize=kwargs.get("randomize", True),
-            )
-        elif method == "label propagation":
-            communities = list(label_propagation_communities(graph))
-            return {
-                node: idx
-                for idx, community in enumerate(communities)
-                for node in community
-            }
-
-        elif method == "girvan newman":
-            k = kwargs.get("max_communities", 5)
-            comp = girvan_newman(graph)
-            limited = []
-            try:
-                for _ in range(k - 1):
-                    limited = next(comp)
-            except StopIteration:
-                pass
-            communities = list(limited) if limited else list(next(comp))
-            return {
-                node: idx
-                for idx, community in enumerate(communities)
-                for node in community
-            }
-        else:
-            raise ValueError(f"Unknown community detection method: {method}")
-
-    def get_network_graph_stats(self):
+        with profiling.stage("detect_communities"):
+            result = run_engine(graph, method, **kwargs)
+        self._last_partition = result.partition
+        return result
+
+    @staticmethod
+    def warm_start_partition(partition: Dict[Any, int], graph: nx.Graph) -> Dict[Any, int]:
+        """Restrict `partition` to the nodes of `graph`, putting new nodes in singleton communities."""
+        next_id = max(partition.values(), default=-1) + 1
+        warm_start = {}
+        for node in graph:
+            community_id = partition.get(node)
+            if community_id is None:
+                community_id, next_id = next_id, next_id + 1
+            warm_start[node] = community_id
+        return warm_start
+
+    def get_network_graph_stats(
+        self, options: Optional[CentralityOptions] = None
+    ) -> GraphStats:
         """
         Compute various graph metrics for each node in the network.
 
+        Metrics are computed lazily on first access and memoized until the graph
+        changes, so repeated calls within and across reruns are cheap. `options`
+        (by default `centrality_options`) select how centralities are computed;
+        the network itself is not changed, so it can be shared between sessions
+        with different options.
+
         Returns:
-            dict: A dictionary containing the following metrics:
+            GraphStats: A read-only mapping containing the following metrics:
 
             - "pagerank" (dict): The PageRank score of each node, representing the importance of a node
             based on its connections.
@@ -111,21 +486,262 @@ class UserNetwork:
         These metrics provide insights into the structure of the network, identifying important nodes, tightly-knit communities,
         and the overall connectivity of the graph.
         """
-        return {
-            "pagerank": nx.pagerank(self.graph),
-            "degree_centrality": nx.degree_centrality(self.graph),
-            "closeness_centrality": nx.closeness_centrality(self.graph),
-            "betweenness_centrality": nx.betweenness_centrality(self.graph),
-            "triadic_closure": nx.triangles(self.graph),
-            "clustering_coefficient": nx.clustering(self.graph),
-        }
+        options = options or self.centrality_options
+        with self._lock:
+            stats = self.__current_stats().get(options)
+            if stats is None:
+                previous = next(reversed(self._stats.values()), None)
+                stats = GraphStats(
+                    self.graph,
+                    self._version,
+                    options,
+                    previous,
+                    adjacency=self.adjacency,
+                )
+                self._stats[options] = stats
+                if len(self._stats) > _MAX_CACHED_STATS:
+                    self._stats.popitem(last=False)
+            else:
+                self._stats.move_to_end(options)
+            return stats
+
+    def get_metric(
+        self, name: str, options: Optional[CentralityOptions] = None
+    ) -> Dict[Any, float]:
+        options = options or self.centrality_options
+        return self.get_network_graph_stats(options).compute(name, options)
+
+    def get_metric_values(
+        self, name: str, options: Optional[CentralityOptions] = None
+    ) -> MetricValues:
+        """
+        A node metric as an array indexed by user id, with cached bounds.
+
+        `name` is "degree" or one of the `GRAPH_METRICS`. Arrays are kept per
+        centrality options until the network changes.
+        """
+        with self._lock:
+            metric_values = self.__current_metric_values(options)
+            values = metric_values.get(name)
+        if values is None:
+            # Computed without the lock: metrics can take long, and GraphStats
+            # already makes concurrent callers wait for the same metric.
+            if name == "degree":
+                array = self._degrees.astype(np.float64)
+            else:
+                metric = self.get_metric(name, options)
+                users_count = len(self.users)
+                array = np.fromiter(
+                    (metric.get(user_id, 0.0) for user_id in range(users_count)),
+                    dtype=np.float64,
+                    count=users_count,
+                )
+            with self._lock:
+                values = metric_values.setdefault(name, MetricValues(array))
+        return values
+
+    def set_metric_values(
+        self, name: str, values: np.ndarray, options: Optional[CentralityOptions] = None
+    ):
+        """
+        Provide a metric computed earlier (e.g. read from a snapshot) for the current
+        network version and centrality options, so `get_metric_values` skips computing it.
+        """
+        if len(values) != len(self.users):
+            raise ValueError(
+                f"Metric {name!r} has {len(values)} values for {len(self.users)} users"
+            )
+        with self._lock:
+            self.__current_metric_values(options)[name] = MetricValues(values)
+
+    def computed_metric_values(
+        self, options: Optional[CentralityOptions] = None
+    ) -> Dict[str, MetricValues]:
+        """Metric arrays already available for the current version and centrality options."""
+        with self._lock:
+            return dict(self.__current_metric_values(options))
+
+    def __current_stats(self) -> "OrderedDict[CentralityOptions, GraphStats]":
+        if self._stats_version != self._version:
+            self._stats = OrderedDict()
+            self._stats_version = self._version
+        return self._stats
+
+    def __current_metric_values(
+        self, options: Optional[CentralityOptions]
+    ) -> Dict[str, MetricValues]:
+        if self._metric_values_version != self._version:
+            self._metric_values = {}
+            self._metric_values_version = self._version
+        return self._metric_values.setdefault(options or self.centrality_options, {})
+
+    def invalidate_stats(self):
+        """Drop memoized metrics and derived views."""
+        with self._lock:
+            self._version += 1
+            self._stats = OrderedDict()
+            self._metric_values = {}
 
     def __init_graph(self, users: List[User], interactions: List[Interaction]):
-        self.graph.add_nodes_from(users)
-        for interaction in interactions:
-            self.graph.add_edge(
-                interaction.user1, interaction.user2, tweet=interaction.tweet
+        self.add_edges(
+            [user.name for user in users],
+            (
+                (
+                    interaction.user1.name,
+                    interaction.user2.name,
+                    {
+                        "weight": 1,
+                        "interaction_types": {interaction.interaction_type: 1},
+                        "first_timestamp": interaction.timestamp,
+                        "last_timestamp": interaction.timestamp,
+                        "tweets": [] if interaction.row is None else [interaction.row],
+                    },
+                )
+                for interaction in interactions
+            ),
+        )
+
+    def _merge_edge_batch(self, batch: pd.DataFrame):
+        if not self._edges.empty:
+            self._edges = _with_python_values(self._edges)
+            batch = _with_python_values(batch)
+        existing = batch.index.intersection(self._edges.index)
+        if len(existing):
+            current = self._edges.loc[existing]
+            incoming = batch.loc[existing]
+            self._edges.loc[existing, "weight"] = current["weight"] + incoming["weight"]
+            self._edges.loc[existing, "first_timestamp"] = np.fmin(
+                current["first_timestamp"], incoming["first_timestamp"]
+            )
+            self._edges.loc[existing, "last_timestamp"] = np.fmax(
+                current["last_timestamp"], incoming["last_timestamp"]
+            )
+            self._edges.loc[existing, "interaction_types"] = pd.Series(
+                [
+                    _merge_counts(old, new)
+                    for old, new in zip(
+                        current["interaction_types"], incoming["interaction_types"]
+                    )
+                ],
+                index=existing,
+                dtype=object,
+            )
+            self._edges.loc[existing, "tweets"] = pd.Series(
+                [
+                    list(old) + list(new)
+                    for old, new in zip(current["tweets"], incoming["tweets"])
+                ],
+                index=existing,
+                dtype=object,
+            )
+            batch = batch.drop(existing)
+
+        self.__update_degrees(batch["source"].to_numpy(), batch["target"].to_numpy())
+        if len(batch):
+            self._edges = batch if self._edges.empty else pd.concat([self._edges, batch])
+
+    def __update_degrees(self, new_sources: np.ndarray, new_targets: np.ndarray):
+        if len(self._degrees) < len(self.users):
+            self._degrees = np.concatenate(
+                [
+                    self._degrees,
+                    np.zeros(len(self.users) - len(self._degrees), dtype=np.int64),
+                ]
+            )
+        np.add.at(self._degrees, new_sources, 1)
+        np.add.at(self._degrees, new_targets, 1)
+        touched = np.concatenate([new_sources, new_targets])
+        if len(touched):
+            self._max_degree = max(self._max_degree, int(self._degrees[touched].max()))
+
+
+# Number of top-degree subgraphs (one per node count) kept per network.
+_MAX_CACHED_SUBGRAPHS = 8
+# Number of centrality option sets whose graph stats are kept per network.
+_MAX_CACHED_STATS = 4
+
+_EDGE_COLUMNS = [
+    "source",
+    "target",
+    "weight",
+    "interaction_types",
+    "first_timestamp",
+    "last_timestamp",
+    "tweets",
+]
+
+
+def _empty_edge_table() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "source": np.empty(0, np.int64),
+            "target": np.empty(0, np.int64),
+            "weight": np.empty(0, np.int64),
+            "interaction_types": np.empty(0, object),
+            "first_timestamp": np.empty(0, "datetime64[ns]"),
+            "last_timestamp": np.empty(0, "datetime64[ns]"),
+            "tweets": np.empty(0, object),
+        },
+        index=pd.Index(np.empty(0, np.int64)),
+    )
+
+
+def _edge_keys(sources: pd.Series, targets: pd.Series) -> pd.Index:
+    return pd.Index((sources.to_numpy() << 32) | targets.to_numpy())
+
+
+def _as_datetime(values: pd.Series) -> np.ndarray:
+    timestamps = pd.to_datetime(pd.Series(values), utc=True)
+    return timestamps.dt.tz_convert(None).to_numpy(dtype="datetime64[ns]")
+
+
+def _edge_values(values: pd.Series):
+    # Arrow-backed columns (from snapshots) are kept as they are.
+    if isinstance(values.dtype, pd.ArrowDtype):
+        return values.array
+    return values.to_numpy(dtype=object)
+
+
+def _with_python_values(edges: pd.DataFrame) -> pd.DataFrame:
+    """
+    `edges` with Arrow-backed "interaction_types" and "tweets" columns turned into
+    the dicts and lists that merging edges works on.
+    """
+    converted = {}
+    for column, convert in (("interaction_types", dict), ("tweets", list)):
+        if isinstance(edges[column].dtype, pd.ArrowDtype):
+            converted[column] = pd.Series(
+                [convert(value) for value in edges[column].tolist()],
+                index=edges.index,
+                dtype=object,
             )
+    return edges.assign(**converted) if converted else edges
+
+
+def _merge_counts(first: dict, second: dict) -> dict:
+    merged = dict(first)
+    for key, count in second.items():
+        merged[key] = merged.get(key, 0) + count
+    return merged
+
+
+def _collapse_duplicate_edges(batch: pd.DataFrame) -> pd.DataFrame:
+    grouped = batch.groupby(level=0, sort=False)
+    collapsed = grouped.agg(
+        source=("source", "first"),
+        target=("target", "first"),
+        weight=("weight", "sum"),
+        first_timestamp=("first_timestamp", "min"),
+        last_timestamp=("last_timestamp", "max"),
+    )
+    collapsed["interaction_types"] = [
+        reduce(_merge_counts, group, {}) for group in grouped["interaction_types"].agg(list)
+    ]
+    collapsed["tweets"] = [
+        [tweet for tweets in group for tweet in tweets]
+        for group in grouped["tweets"].agg(list)
+    ]
+    return collapsed[_EDGE_COLUMNS]
 
 
 @dataclass(frozen=True)
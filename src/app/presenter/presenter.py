@@ -1,37 +1,118 @@
-import matplotlib.colors as mcolors
+import threading
+from typing import TYPE_CHECKING, Optional
+
 import networkx as nx
-from matplotlib import cm
-from pyvis.network import Network
+import numpy as np
+import pandas as pd
 
 from src.app.model import UserNetwork
-from src.app.utils.constants import NodeSizeMetric
+from src.app.presenter.renderer import community_colors, render_webgl_html
+from src.app.utils import profiling
+from src.app.utils.community_engines import CommunityResult
+from src.app.utils.constants import (
+    WEBGL_RENDER_EDGE_THRESHOLD,
+    NodeSizeMetric,
+    NodeSizeScale,
+    RenderMode,
+)
+from src.app.utils.jobs import raise_if_cancelled
+from src.app.utils.metrics import GRAPH_METRICS, CentralityOptions, MetricValues
+
+if TYPE_CHECKING:
+    from pyvis.network import Network
 
 
 class NetworkPresenter:
     def __init__(
-        self, user_network: UserNetwork, min_node_size: int = 5, max_node_size: int = 20
+        self,
+        user_network: UserNetwork,
+        min_node_size: int = 5,
+        max_node_size: int = 20,
+        centrality_options: Optional[CentralityOptions] = None,
     ):
         self.user_network = user_network
+        # The network may be shared between sessions; metrics use these options.
+        self.centrality_options = centrality_options or user_network.centrality_options
         self.partition = None
+        self.community_result = None
         self.min_node_size = min_node_size
         self.max_node_size = max_node_size
-        self.metric = self.node_degree_metric
+        self.set_metric(NodeSizeMetric.DEGREE)
 
     def visualize_network(
-        self, params, top_neighbours_nodes=None, algorithm: str = "louvain"
+        self,
+        params,
+        top_neighbours_nodes=None,
+        algorithm: str = "louvain",
+        render_mode: str = RenderMode.PYVIS,
+        community_result: Optional[CommunityResult] = None,
+        cancelled: Optional[threading.Event] = None,
     ) -> str:
-        graph = self.user_network.graph
-        if top_neighbours_nodes is not None:
-            graph = self.get_subgraph_with_top_degree_vertices(top_neighbours_nodes)
+        """
+        HTML of the (top-degree sub)graph coloured by community. A `community_result`
+        computed earlier for the same graph and settings skips community detection.
+        With `cancelled`, stops between stages (and inside community detection) once
+        it is set.
+        """
+        with profiling.stage("select_subgraph"):
+            graph = self.user_network.graph
+            if top_neighbours_nodes is not None:
+                graph = self.get_subgraph_with_top_degree_vertices(top_neighbours_nodes)
+
+        if community_result is None:
+            community_result = self.user_network.run_community_detection(
+                graph, algorithm, cancelled=cancelled, **params
+            )
+        self.community_result = community_result
+        self.partition = self.community_result.partition
+        if cancelled is not None:
+            raise_if_cancelled(cancelled)
+
+        if render_mode == RenderMode.AUTO:
+            large = graph.number_of_edges() > WEBGL_RENDER_EDGE_THRESHOLD
+            render_mode = RenderMode.WEBGL if large else RenderMode.PYVIS
+        with profiling.stage("render_html"):
+            if render_mode == RenderMode.WEBGL:
+                return render_webgl_html(
+                    self.user_network, graph, self.partition, self.metric(graph.nodes())
+                )
 
-        self.partition = self.user_network.detect_communities(
-            graph, algorithm, **params
-        )
-        net = self.create_network(graph, self.partition)
+            net = self.create_network(graph, self.partition)
+
+            return net.generate_html()
+
+    def get_metrics_table(
+        self, cancelled: Optional[threading.Event] = None
+    ) -> tuple[pd.DataFrame, CentralityOptions]:
+        """
+        Per-user metrics table, most central users first, and the centrality options
+        it was computed with. With `cancelled`, stops between metrics once it is set.
+        """
+        network = self.user_network
+        centrality_options = self.centrality_options
+        columns = {
+            "Degree Centrality": "degree_centrality",
+            "Closeness Centrality": "closeness_centrality",
+            "Betweenness Centrality": "betweenness_centrality",
+            "Triads": "triadic_closure",
+            "Clustering Coefficient": "clustering_coefficient",
+        }
+
+        table = {"User": network.users.names[: network.number_of_users()]}
+        for column, metric_name in columns.items():
+            if cancelled is not None:
+                raise_if_cancelled(cancelled)
+            values = network.get_metric_values(metric_name, centrality_options).values
+            table[column] = values if metric_name == "triadic_closure" else values.round(4)
 
-        return net.generate_html()
+        df = pd.DataFrame(table)
+        df["Triads"] = df["Triads"].astype(np.int64)
+        return df.sort_values("Degree Centrality", ascending=False), centrality_options
+
+    def create_network(self, graph: nx.Graph, partition: dict) -> "Network":
+        # pyvis loads IPython; import it only when the interactive renderer is used.
+        from pyvis.network import Network
 
-    def create_network(self, graph: nx.Graph, partition: dict) -> Network:
         net = Network(
             height="600px",
             width="100%",
@@ -39,19 +120,17 @@ class NetworkPresenter:
             font_color="white",
             directed=False,
         )
-        cmap = cm.get_cmap("tab20", max(partition.values()) + 1)
+        colors = community_colors(partition)
 
         nodes_with_sizes = self.metric(graph.nodes())
         for node, size in nodes_with_sizes.items():
-            group = partition.get(node, 0)
-            color = mcolors.to_hex(cmap(group))
-
-            net.add_node(str(node), label=str(node), color=color, size=size)
+            color = colors[partition.get(node, 0)]
 
-            # net.add_node(str(node), label=str(node), color=color)
+            label = self.user_network.get_username(node)
+            net.add_node(node, label=label, color=color, size=size)
 
         for source, target in graph.edges():
-            net.add_edge(str(source), str(target))
+            net.add_edge(source, target)
 
         net.repulsion(node_distance=120, spring_length=100)
 
@@ -60,79 +139,58 @@ class NetworkPresenter:
     def get_subgraph_with_top_degree_vertices(
         self, number_of_top_vertices: int = 10
     ) -> nx.Graph:
-        graph = self.user_network.graph
-        top_nodes_by_degree = sorted(
-            graph, key=lambda node: graph.degree[node], reverse=True
-        )[:number_of_top_vertices]
-
-        subgraph_nodes = set(top_nodes_by_degree)
-        for node in top_nodes_by_degree:
-            subgraph_nodes.update(graph.neighbors(node))
-
-        return graph.subgraph(subgraph_nodes)
-
-    def node_degree_metric(self, nodes) -> dict[str, float]:
-        min_degree = self.user_network.get_min_degree()
-        max_degree = self.user_network.get_max_degree()
-
-        nodes_with_sizes = dict()
-        for node in nodes:
-            value = self.user_network.graph.degree[node]
-            nodes_with_sizes[node] = self.__calculate_node_size(
-                value, min_degree, max_degree
-            )
-
-        return nodes_with_sizes
-
-    def betweenness_centrality_metric(self, nodes, centrality) -> dict[str, float]:
-        min_val = min(centrality.values())
-        max_val = max(centrality.values())
-        return {
-            node: self.__calculate_node_size(centrality[node], min_val, max_val)
-            for node in nodes
-        }
-
-    def closeness_centrality_metric(self, nodes, closeness) -> dict[str, float]:
-        min_val = min(closeness.values())
-        max_val = max(closeness.values())
-        return {
-            node: self.__calculate_node_size(closeness[node], min_val, max_val)
-            for node in nodes
-        }
-
-    def pagerank_metric(self, nodes, pagerank) -> dict[str, float]:
-        min_val = min(pagerank.values())
-        max_val = max(pagerank.values())
-        return {
-            node: self.__calculate_node_size(pagerank[node], min_val, max_val)
-            for node in nodes
-        }
+        return self.user_network.top_degree_subgraph(number_of_top_vertices)
+
+    def metric_node_sizes(
+        self, nodes, metric_name: str, scale: str = NodeSizeScale.LINEAR
+    ) -> dict[int, float]:
+        """
+        Node sizes for `nodes` from a metric of the whole network, scaled in one
+        vectorized step. See `UserNetwork.get_metric_values` for metric names.
+        """
+        nodes = np.fromiter(nodes, dtype=np.int64)
+        metric = self.user_network.get_metric_values(
+            metric_name, self.centrality_options
+        )
+        sizes = self.__calculate_node_sizes(metric, metric.values[nodes], scale)
+        return dict(zip(nodes.tolist(), sizes.tolist()))
 
-    def set_metric(self, metric_name: str):
-        graph_stats = self.user_network.get_network_graph_stats()
+    def set_metric(self, metric_name: str, scale: str = NodeSizeScale.LINEAR):
+        # Metrics are looked up lazily so only the selected one is ever computed.
         match metric_name:
             case NodeSizeMetric.DEGREE:
-                self.metric = self.node_degree_metric
+                network_metric = "degree"
             case NodeSizeMetric.BETWEENNESS:
-                self.metric = lambda nodes: self.betweenness_centrality_metric(
-                    nodes, centrality=graph_stats["betweenness_centrality"]
-                )
+                network_metric = "betweenness_centrality"
             case NodeSizeMetric.CLOSENESS:
-                self.metric = lambda nodes: self.closeness_centrality_metric(
-                    nodes, closeness=graph_stats["closeness_centrality"]
-                )
+                network_metric = "closeness_centrality"
             case NodeSizeMetric.PAGERANK:
-                self.metric = lambda nodes: self.pagerank_metric(
-                    nodes, pagerank=graph_stats["pagerank"]
-                )
+                network_metric = "pagerank"
+            case _ if metric_name in GRAPH_METRICS:
+                network_metric = metric_name
             case _:
                 raise ValueError(f"Unknown metric: {metric_name}")
 
-    def __calculate_node_size(
-        self, value: int | float, min_value: int | float, max_value: int | float
-    ) -> float:
+        scale = NodeSizeScale(scale)
+        self.metric = lambda nodes: self.metric_node_sizes(nodes, network_metric, scale)
+
+    def __calculate_node_sizes(
+        self, metric: MetricValues, values: np.ndarray, scale: NodeSizeScale
+    ) -> np.ndarray:
+        match scale:
+            case NodeSizeScale.LOG:
+                # Shifted so the smallest value maps to log(1) = 0.
+                scaled = np.log1p(values - metric.min)
+                low, high = 0.0, np.log1p(metric.max - metric.min)
+            case NodeSizeScale.QUANTILE:
+                scaled = metric.ranks(values)
+                low, high = 0.0, 1.0
+            case _:
+                scaled = values
+                low, high = metric.min, metric.max
 
         scaler = self.max_node_size - self.min_node_size
-        return (
-            self.min_node_size + (value - min_value) / (max_value - min_value) * scaler
-        )
+        if high <= low:
+            # Every node has the same value: use the middle size.
+            return np.full(len(values), self.min_node_size + scaler / 2)
+        return self.min_node_size + (scaled - low) / (high - low) * scaler
@@ -0,0 +1,222 @@
+import json
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, List, Sequence, Tuple
+
+import matplotlib
+import matplotlib.colors as mcolors
+import networkx as nx
+import numpy as np
+
+from src.app.model import UserNetwork
+from src.app.utils.constants import DEFAULT_SEED
+
+# Graphs up to this size get a full force-directed layout; larger ones are laid
+# out by community (see `community_layout`).
+SPRING_LAYOUT_MAX_NODES = 300
+# Rendered edges are sampled down to this budget on large graphs.
+MAX_RENDERED_EDGES = 20_000
+MAX_CACHED_LAYOUTS = 16
+
+_GOLDEN_ANGLE = np.pi * (3 - np.sqrt(5))
+
+_layout_cache: "weakref.WeakKeyDictionary[UserNetwork, OrderedDict]" = (
+    weakref.WeakKeyDictionary()
+)
+# Streamlit runs every session in its own thread; the layout itself is computed
+# outside the lock, so concurrent misses may compute the same layout twice.
+_layout_cache_lock = threading.Lock()
+
+_WEBGL_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<script src="https://cdn.jsdelivr.net/npm/graphology@0.25.4/dist/graphology.umd.min.js"></script>
+<script src="https://cdn.jsdelivr.net/npm/sigma@2.4.0/build/sigma.min.js"></script>
+<style>
+  html, body {{ margin: 0; background: #222222; }}
+  #graph {{ width: 100%; height: {height}px; }}
+</style>
+</head>
+<body>
+<div id="graph"></div>
+<script id="graph-data" type="application/json">{payload}</script>
+<script>
+  const data = JSON.parse(document.getElementById("graph-data").textContent);
+  const graph = new graphology.Graph({{ type: "undirected" }});
+  const nodes = data.nodes;
+  for (let i = 0; i < nodes.x.length; i++) {{
+    graph.addNode(i, {{
+      x: nodes.x[i], y: nodes.y[i], size: nodes.size[i],
+      color: data.palette[nodes.color[i]], label: nodes.label[i],
+    }});
+  }}
+  const edges = data.edges;
+  for (let i = 0; i < edges.length; i += 2) {{
+    graph.addEdge(edges[i], edges[i + 1], {{ size: 0.5, color: "#555555" }});
+  }}
+  new Sigma(graph, document.getElementById("graph"), {{
+    labelColor: {{ color: "#ffffff" }},
+    labelRenderedSizeThreshold: 8,
+  }});
+</script>
+</body>
+</html>
+"""
+
+
+def community_colors(partition: Dict[Any, int]) -> List[str]:
+    """Hex color for every community id, 0..max(partition)."""
+    communities = max(partition.values(), default=0) + 1
+    cmap = matplotlib.colormaps["tab20"].resampled(communities)
+    return [mcolors.to_hex(cmap(idx)) for idx in range(communities)]
+
+
+def get_layout(
+    user_network: UserNetwork, graph: nx.Graph, partition: Dict[Any, int]
+) -> Tuple[List[Any], np.ndarray]:
+    """
+    Node order and (n, 2) positions for `graph`, cached per network version and partition.
+    """
+    key = (
+        user_network.version,
+        hash(tuple(sorted(partition.items()))),
+        graph.number_of_nodes(),
+        graph.number_of_edges(),
+    )
+    with _layout_cache_lock:
+        cache = _layout_cache.setdefault(user_network, OrderedDict())
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+
+    nodes = list(graph)
+    if len(nodes) <= SPRING_LAYOUT_MAX_NODES:
+        layout = nx.spring_layout(graph, seed=DEFAULT_SEED)
+        positions = np.array([layout[node] for node in nodes]).reshape(-1, 2)
+    else:
+        positions = community_layout(graph, nodes, partition)
+
+    with _layout_cache_lock:
+        cache[key] = (nodes, positions)
+        if len(cache) > MAX_CACHED_LAYOUTS:
+            cache.popitem(last=False)
+    return nodes, positions
+
+
+def community_layout(
+    graph: nx.Graph, nodes: Sequence[Any], partition: Dict[Any, int]
+) -> np.ndarray:
+    """
+    O(n) layout for large graphs: communities are placed with a spring layout of
+    the community graph (or on a spiral when there are too many of them), and
+    nodes are arranged on a sunflower spiral around their community center with
+    the highest-degree nodes in the middle.
+    """
+    index = {node: idx for idx, node in enumerate(nodes)}
+    communities = np.fromiter(
+        (partition.get(node, -1) for node in nodes), dtype=np.int64, count=len(nodes)
+    )
+    community_ids, membership, sizes = np.unique(
+        communities, return_inverse=True, return_counts=True
+    )
+    degrees = np.fromiter(
+        (degree for _, degree in graph.degree(nodes)), dtype=np.int64, count=len(nodes)
+    )
+    radii = np.sqrt(sizes)
+
+    if len(community_ids) <= SPRING_LAYOUT_MAX_NODES:
+        community_graph = nx.Graph()
+        community_graph.add_nodes_from(range(len(community_ids)))
+        edges = np.array(
+            [(index[u], index[v]) for u, v in graph.edges()], dtype=np.int64
+        ).reshape(-1, 2)
+        pairs = np.sort(membership[edges], axis=1)
+        pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+        if len(pairs):
+            unique_pairs, counts = np.unique(pairs, axis=0, return_counts=True)
+            community_graph.add_weighted_edges_from(
+                zip(unique_pairs[:, 0].tolist(), unique_pairs[:, 1].tolist(), counts.tolist())
+            )
+        layout = nx.spring_layout(community_graph, seed=DEFAULT_SEED)
+        centers = np.array([layout[idx] for idx in range(len(community_ids))])
+        centers *= 2.5 * np.sqrt(len(nodes))
+    else:
+        rank = np.argsort(np.argsort(-sizes, kind="stable"), kind="stable")
+        centers = _spiral(rank, 2.5 * radii.max())
+
+    order = np.lexsort((-degrees, membership))
+    group_start = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    rank_in_group = np.empty(len(nodes), dtype=np.int64)
+    rank_in_group[order] = np.arange(len(nodes)) - group_start[membership[order]]
+
+    return centers[membership] + _spiral(rank_in_group, 1.0)
+
+
+def sample_edges(
+    sources: np.ndarray, targets: np.ndarray, weights: np.ndarray, max_edges: int
+) -> np.ndarray:
+    """
+    Indices of at most `max_edges` edges to draw: each node keeps its heaviest
+    edge so no node looks isolated, and the rest of the budget goes to the
+    heaviest remaining edges.
+    """
+    if len(sources) <= max_edges:
+        return np.arange(len(sources))
+
+    order = np.lexsort((np.arange(len(weights)), -weights))
+    keep = np.zeros(len(sources), dtype=bool)
+    for endpoints in (sources, targets):
+        _, first = np.unique(endpoints[order], return_index=True)
+        keep[order[first]] = True
+
+    selected = order[keep[order]][:max_edges]
+    remaining = max_edges - len(selected)
+    if remaining > 0:
+        selected = np.concatenate([selected, order[~keep[order]][:remaining]])
+    return np.sort(selected)
+
+
+def render_webgl_html(
+    user_network: UserNetwork,
+    graph: nx.Graph,
+    partition: Dict[Any, int],
+    node_sizes: Dict[Any, float],
+    height: int = 600,
+) -> str:
+    """
+    Self-contained HTML page that draws `graph` with sigma.js (WebGL).
+
+    Positions are computed here, so the browser runs no physics simulation; the
+    graph is shipped as one columnar JSON payload.
+    """
+    nodes, positions = get_layout(user_network, graph, partition)
+    index = {node: idx for idx, node in enumerate(nodes)}
+
+    edges = np.array(
+        [(index[u], index[v], w) for u, v, w in graph.edges(data="weight", default=1)],
+        dtype=np.int64,
+    ).reshape(-1, 3)
+    kept = sample_edges(edges[:, 0], edges[:, 1], edges[:, 2], MAX_RENDERED_EDGES)
+
+    payload = {
+        "palette": community_colors(partition),
+        "nodes": {
+            "x": np.round(positions[:, 0], 3).tolist(),
+            "y": np.round(positions[:, 1], 3).tolist(),
+            "size": [round(float(node_sizes[node]), 1) for node in nodes],
+            "color": [partition.get(node, 0) for node in nodes],
+            "label": user_network.get_usernames(nodes),
+        },
+        "edges": edges[kept, :2].ravel().tolist(),
+    }
+    payload_json = json.dumps(payload, separators=(",", ":")).replace("</", "<\\/")
+
+    return _WEBGL_TEMPLATE.format(height=height, payload=payload_json)
+
+
+def _spiral(rank: np.ndarray, spacing: float) -> np.ndarray:
+    radius = spacing * np.sqrt(rank + 0.5)
+    angle = rank * _GOLDEN_ANGLE
+    return np.column_stack([radius * np.cos(angle), radius * np.sin(angle)])
@@ -0,0 +1,86 @@
+"""
+Building blocks of Brandes' algorithm for unweighted graphs: the shortest-path
+DAG from one source and the accumulation of its dependencies onto edges or nodes.
+
+They visit nodes, neighbours and predecessors in the same order as NetworkX's
+betweenness functions, so sums built from them are the same floats NetworkX
+computes. Unlike `nx.edge_betweenness_centrality`, callers drive the loop over
+sources and can stop between two of them.
+"""
+
+from collections import deque
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+ShortestPathDag = Tuple[List[Any], Dict[Any, List[Any]], Dict[Any, float]]
+
+
+def shortest_path_dag(adjacency, source: Any) -> ShortestPathDag:
+    """
+    BFS from `source`: the reached nodes in order of distance, the shortest-path
+    predecessors of every reached node and the number of shortest paths to it.
+
+    `adjacency` maps a node to its neighbours: a NetworkX graph, or positional
+    adjacency lists as built by `parallel.adjacency_lists` (or shared by
+    `parallel.map_chunks`).
+    """
+    order = []
+    predecessors = {source: []}
+    sigma = {source: 1.0}
+    distance = {source: 0}
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        order.append(node)
+        next_distance = distance[node] + 1
+        node_sigma = sigma[node]
+        for neighbour in adjacency[node]:
+            if neighbour not in distance:
+                queue.append(neighbour)
+                distance[neighbour] = next_distance
+                predecessors[neighbour] = []
+                sigma[neighbour] = 0.0
+            if distance[neighbour] == next_distance:
+                sigma[neighbour] += node_sigma
+                predecessors[neighbour].append(node)
+    return order, predecessors, sigma
+
+
+def accumulate_edges(betweenness: Dict[Tuple[Any, Any], float], dag: ShortestPathDag):
+    """
+    Add the dependencies of one source's shortest paths to the edges of
+    `betweenness`, which holds every edge of the graph as (u, v) or (v, u).
+    """
+    order, predecessors, sigma = dag
+    delta = dict.fromkeys(order, 0)
+    for node in reversed(order):
+        coefficient = (1 + delta[node]) / sigma[node]
+        for predecessor in predecessors[node]:
+            dependency = sigma[predecessor] * coefficient
+            if (predecessor, node) in betweenness:
+                betweenness[(predecessor, node)] += dependency
+            else:
+                betweenness[(node, predecessor)] += dependency
+            delta[predecessor] += dependency
+
+
+def source_dependencies(
+    adjacency: Sequence[Sequence[int]], sources: Sequence[int]
+) -> np.ndarray:
+    """
+    Dependencies of every node on the shortest paths from each of `sources`, one
+    row per source, on positional adjacency lists. The source itself and the
+    nodes it does not reach depend 0.
+    """
+    dependencies = np.zeros((len(sources), len(adjacency)))
+    for row, source in zip(dependencies, sources):
+        order, predecessors, sigma = shortest_path_dag(adjacency, source)
+        delta = dict.fromkeys(order, 0)
+        for node in reversed(order):
+            coefficient = (1 + delta[node]) / sigma[node]
+            for predecessor in predecessors[node]:
+                delta[predecessor] += sigma[predecessor] * coefficient
+        delta[source] = 0
+        row[list(delta)] = list(delta.values())
+    return dependencies
@@ -0,0 +1,198 @@
+import hashlib
+import io
+import logging
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Callable, Optional, Tuple, Union
+
+import pandas as pd
+import streamlit as st
+
+from src.app.utils import snapshot
+from src.app.utils.dataset_profile import DatasetProfile
+from src.app.utils.df_parser import get_text_column, is_dataframe_with_content
+from src.app.utils.row_index import UserRowIndex
+from src.app.utils.text_analysis import render_word_cloud, token_frequencies
+from src.app.utils.text_entities import TextEntities, extract_entities
+
+if TYPE_CHECKING:
+    # Network building pulls in NetworkX and SciPy; it is imported by the
+    # functions that build networks, on first use of the graph view.
+    from src.app.model import UserNetwork
+
+# Upper bounds on what is kept across reruns; least recently used entries are evicted first.
+MAX_CACHED_DATASETS = 4
+MAX_CACHED_NETWORKS = 8
+MAX_CACHED_IMAGES = 16
+
+# Saved networks, metrics and partitions, one directory per source file hash.
+SNAPSHOT_ROOT = snapshot.DEFAULT_SNAPSHOT_ROOT
+
+logger = logging.getLogger(__name__)
+
+_profile_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dataset-profile")
+
+DataSource = Union[str, "st.runtime.uploaded_file_manager.UploadedFile"]
+
+
+def open_binary(source: DataSource) -> BinaryIO:
+    if isinstance(source, str):
+        return open(source, "rb")
+    return io.BytesIO(source.getvalue())
+
+
+def get_file_hash(source: DataSource) -> str:
+    """Content hash of an uploaded file or of a CSV on disk."""
+    if isinstance(source, str):
+        stat = os.stat(source)
+        return _hash_path(os.path.abspath(source), stat.st_mtime_ns, stat.st_size)
+
+    return hashlib.blake2b(source.getvalue(), digest_size=16).hexdigest()
+
+
+@lru_cache(maxsize=32)
+def _hash_path(path: str, mtime_ns: int, size: int) -> str:
+    return snapshot.hash_file(path)
+
+
+@st.cache_data(max_entries=MAX_CACHED_DATASETS, show_spinner="Loading data...")
+def load_dataframe(file_hash: str, _source: DataSource) -> pd.DataFrame:
+    """
+    Parse a CSV once per distinct content.
+
+    `file_hash` is the cache key; `_source` is excluded from hashing by Streamlit.
+    """
+    with open_binary(_source) as file:
+        return pd.read_csv(file)
+
+
+def start_dataset_profile(file_hash: str, df: pd.DataFrame) -> "Future[DatasetProfile]":
+    """
+    Compute the exploration summaries of a dataset in a background thread, once per content.
+
+    The returned future is shared between reruns; `df` must not be mutated. A
+    profile that failed is not kept: the next call computes it again.
+    """
+    future = _submit_dataset_profile(file_hash, df)
+    if future.done() and future.exception() is not None:
+        _submit_dataset_profile.clear(file_hash, df)
+        future = _submit_dataset_profile(file_hash, df)
+    return future
+
+
+@st.cache_resource(max_entries=MAX_CACHED_DATASETS, show_spinner=False)
+def _submit_dataset_profile(file_hash: str, _df: pd.DataFrame) -> "Future[DatasetProfile]":
+    return _profile_executor.submit(DatasetProfile.from_dataframe, _df)
+
+
+@st.cache_resource(max_entries=MAX_CACHED_DATASETS, show_spinner=False)
+def get_user_row_index(file_hash: str, _df: pd.DataFrame) -> UserRowIndex:
+    return UserRowIndex(_df["name"])
+
+
+@st.cache_resource(max_entries=MAX_CACHED_DATASETS, show_spinner="Building network...")
+def build_full_user_network(file_hash: str, _df: pd.DataFrame) -> "UserNetwork":
+    """
+    Build the network of a whole dataset once per content and save its snapshot.
+
+    Mentions come from `get_text_entities`, so the text column is scanned once for
+    the network and the word cloud.
+    """
+    from src.app.utils.utils import create_user_network
+
+    entities = None
+    if is_dataframe_with_content(_df):
+        entities = get_text_entities(file_hash, _df)
+    network = create_user_network(_df, entities)
+    save_network_snapshot(get_snapshot_path(file_hash), network)
+    return network
+
+
+@st.cache_resource(max_entries=MAX_CACHED_NETWORKS, show_spinner="Sampling network...")
+def build_user_network(
+    file_hash: str, max_nodes: int, strategy: str, seed: int, _network: "UserNetwork"
+) -> "UserNetwork":
+    """
+    Sample the network of a dataset once per sampling parameters.
+
+    `_network` is the full network of the dataset identified by `file_hash`. The
+    sample is shared between reruns, so the metrics it memoizes are reused as well,
+    and is saved as a snapshot next to the one of the full network.
+    """
+    from src.app.utils.sampling import sample_network
+
+    path = get_snapshot_path(file_hash, max_nodes, strategy, seed)
+    if snapshot.has_snapshot(path):
+        return snapshot.load_network(path)
+
+    network = sample_network(_network, strategy, max_nodes, seed)
+    save_network_snapshot(path, network)
+    return network
+
+
+@st.cache_resource(max_entries=MAX_CACHED_NETWORKS, show_spinner=False)
+def stream_user_network(
+    file_hash: str,
+    chunksize: int,
+    _source: DataSource,
+    _on_progress: Optional[Callable[[int, float], None]] = None,
+) -> Tuple["UserNetwork", int]:
+    """Build the network for a whole CSV with chunked reads, once per content and chunk size."""
+    from src.app.utils.utils import create_user_network_from_csv
+
+    with open_binary(_source) as file:
+        network, rows_count = create_user_network_from_csv(file, chunksize, _on_progress)
+    save_network_snapshot(get_snapshot_path(file_hash), network)
+    return network, rows_count
+
+
+def get_snapshot_path(
+    file_hash: str,
+    max_nodes: Optional[int] = None,
+    strategy: Optional[str] = None,
+    seed: Optional[int] = None,
+) -> Path:
+    """Snapshot directory of a dataset's full network, or of one of its samples."""
+    return snapshot.snapshot_path(SNAPSHOT_ROOT, file_hash, max_nodes, strategy, seed)
+
+
+def has_network_snapshot(file_hash: str) -> bool:
+    return snapshot.has_snapshot(get_snapshot_path(file_hash))
+
+
+def get_snapshot_rows_count(file_hash: str) -> Optional[int]:
+    return snapshot.saved_rows_count(get_snapshot_path(file_hash))
+
+
+@st.cache_resource(max_entries=MAX_CACHED_DATASETS, show_spinner="Opening saved network...")
+def load_network_snapshot(file_hash: str) -> "UserNetwork":
+    """Open the saved network of a dataset analysed before, instead of rebuilding it."""
+    return snapshot.load_network(get_snapshot_path(file_hash))
+
+
+def save_network_snapshot(path: Path, network: "UserNetwork"):
+    # Snapshots only speed up later sessions, so a failed write is not an error.
+    try:
+        snapshot.save_network(network, path)
+        snapshot.evict_snapshots(SNAPSHOT_ROOT, keep=[path])
+    except OSError as e:
+        logger.warning("Could not save network snapshot to %s: %s", path, e)
+
+
+@st.cache_resource(max_entries=MAX_CACHED_DATASETS, show_spinner=False)
+def get_text_entities(file_hash: str, _df: pd.DataFrame) -> TextEntities:
+    """Mentions, hashtags and URLs of a dataset's text column, extracted once."""
+    return extract_entities(get_text_column(_df))
+
+
+@st.cache_data(max_entries=MAX_CACHED_DATASETS, show_spinner=False)
+def get_token_frequencies(file_hash: str, prefix: str, _df: pd.DataFrame) -> pd.Series:
+    return token_frequencies(get_text_entities(file_hash, _df), prefix)
+
+
+@st.cache_data(max_entries=MAX_CACHED_IMAGES, show_spinner="Rendering word cloud...")
+def get_word_cloud(file_hash: str, prefix: str, top_n: int, _df: pd.DataFrame) -> bytes:
+    """PNG word cloud of the `top_n` most common tokens, rendered once per key."""
+    return render_word_cloud(get_token_frequencies(file_hash, prefix, _df).head(top_n))
@@ -0,0 +1,243 @@
+import importlib.util
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import community as community_louvain
+import networkx as nx
+from networkx.algorithms.community import (
+    girvan_newman,
+    label_propagation_communities,
+    louvain_partitions,
+    modularity,
+)
+
+from src.app.utils.brandes import accumulate_edges, shortest_path_dag
+from src.app.utils.constants import DEFAULT_SEED
+from src.app.utils.jobs import raise_if_cancelled
+
+Partition = Dict[Any, int]
+
+
+@dataclass
+class CommunityResult:
+    partition: Partition
+    modularity: float
+    runtime: float
+    engine: str
+
+
+@dataclass
+class CommunityEngine:
+    name: str
+    detect: Callable[..., Partition]
+    requires: Tuple[str, ...] = field(default_factory=tuple)
+
+    def is_available(self) -> bool:
+        return all(importlib.util.find_spec(module) for module in self.requires)
+
+
+COMMUNITY_ENGINES: Dict[str, CommunityEngine] = {}
+
+
+def register_engine(name: str, requires: Iterable[str] = ()):
+    """Register a community detection function under `name` (case-insensitive)."""
+
+    def decorator(detect: Callable[..., Partition]) -> Callable[..., Partition]:
+        COMMUNITY_ENGINES[name.lower()] = CommunityEngine(name, detect, tuple(requires))
+        return detect
+
+    return decorator
+
+
+def available_engines() -> List[str]:
+    return [engine.name for engine in COMMUNITY_ENGINES.values() if engine.is_available()]
+
+
+def run_engine(
+    graph: nx.Graph,
+    method: str,
+    cancelled: Optional[threading.Event] = None,
+    **kwargs,
+) -> CommunityResult:
+    """
+    Run a registered engine and report the modularity and runtime of its partition.
+
+    Every engine accepts `seed` (defaults to `DEFAULT_SEED`), so results are
+    reproducible across reruns. Once `cancelled` is set, no engine is started and
+    the engines that iterate (time-limited Louvain, Girvan-Newman) stop at their
+    next step by raising `CancelledError`.
+    """
+    engine = COMMUNITY_ENGINES.get(method.lower())
+    if engine is None:
+        raise ValueError(f"Unknown community detection method: {method}")
+    if not engine.is_available():
+        raise ValueError(
+            f"Community detection method {engine.name} requires: {', '.join(engine.requires)}"
+        )
+
+    kwargs.setdefault("seed", DEFAULT_SEED)
+    if cancelled is not None:
+        raise_if_cancelled(cancelled)
+    start = time.perf_counter()
+    partition = engine.detect(graph, cancelled=cancelled, **kwargs)
+    runtime = time.perf_counter() - start
+
+    return CommunityResult(
+        partition=partition,
+        modularity=_partition_modularity(graph, partition, kwargs.get("weight", "weight")),
+        runtime=runtime,
+        engine=engine.name,
+    )
+
+
+@register_engine("Louvain")
+def detect_louvain(
+    graph: nx.Graph,
+    partition: Optional[Partition] = None,
+    weight: str = "weight",
+    resolution: float = 1.0,
+    seed: int = DEFAULT_SEED,
+    **_,
+) -> Partition:
+    return community_louvain.best_partition(
+        graph,
+        partition=partition,
+        weight=weight,
+        resolution=resolution,
+        random_state=seed,
+    )
+
+
+@register_engine("Time-limited Louvain")
+def detect_time_limited_louvain(
+    graph: nx.Graph,
+    weight: str = "weight",
+    resolution: float = 1.0,
+    seed: int = DEFAULT_SEED,
+    time_limit: Optional[float] = None,
+    cancelled: Optional[threading.Event] = None,
+    **_,
+) -> Partition:
+    """
+    NetworkX Louvain, which is not faster than python-louvain but yields every
+    level: with `time_limit` it stops after the level that exceeds it.
+    """
+    deadline = _deadline(time_limit)
+    communities = [{node} for node in graph]
+    for communities in louvain_partitions(
+        graph, weight=weight, resolution=resolution, seed=seed
+    ):
+        if cancelled is not None:
+            raise_if_cancelled(cancelled)
+        if time.perf_counter() > deadline:
+            break
+    return _to_partition(communities)
+
+
+@register_engine("Leiden", requires=("igraph", "leidenalg"))
+def detect_leiden(
+    graph: nx.Graph,
+    weight: str = "weight",
+    resolution: float = 1.0,
+    seed: int = DEFAULT_SEED,
+    **_,
+) -> Partition:
+    """
+    Leiden algorithm through `leidenalg` (listed in requirements.txt). It is only
+    offered when `igraph` and `leidenalg` can be imported.
+    """
+    import igraph as ig
+    import leidenalg
+
+    nodes = list(graph)
+    index = {node: idx for idx, node in enumerate(nodes)}
+    edges = list(graph.edges(data=weight, default=1))
+    ig_graph = ig.Graph(n=len(nodes), edges=[(index[u], index[v]) for u, v, _ in edges])
+    result = leidenalg.find_partition(
+        ig_graph,
+        leidenalg.RBConfigurationVertexPartition,
+        weights=[w for _, _, w in edges],
+        resolution_parameter=resolution,
+        seed=seed,
+    )
+    return dict(zip(nodes, result.membership))
+
+
+@register_engine("Label Propagation")
+def detect_label_propagation(graph: nx.Graph, **_) -> Partition:
+    return _to_partition(label_propagation_communities(graph))
+
+
+@register_engine("Girvan Newman")
+def detect_girvan_newman(
+    graph: nx.Graph,
+    max_communities: int = 5,
+    time_limit: Optional[float] = None,
+    weight: str = "weight",
+    cancelled: Optional[threading.Event] = None,
+    **_,
+) -> Partition:
+    """
+    Girvan-Newman stopped after `max_communities - 1` splitting levels, which
+    gives `max_communities` communities on a connected graph.
+
+    With `time_limit`, returns the last level finished within the limit instead
+    (the connected components if not even the first one is). The limit is
+    checked after every BFS of the edge betweenness passes, so it is overshot by
+    at most one BFS.
+    """
+    deadline = _deadline(time_limit)
+    communities = list(nx.connected_components(graph))
+
+    def most_valuable_edge(graph: nx.Graph):
+        # Unnormalized edge betweenness: the same maximum as NetworkX's default.
+        betweenness = dict.fromkeys(graph.edges(), 0.0)
+        for source in graph:
+            accumulate_edges(betweenness, shortest_path_dag(graph, source))
+            if cancelled is not None:
+                raise_if_cancelled(cancelled)
+            if time.perf_counter() > deadline:
+                raise _TimeLimitReached
+        return max(betweenness, key=betweenness.get)
+
+    levels = enumerate(girvan_newman(graph, most_valuable_edge), start=1)
+    try:
+        for level, level_communities in levels:
+            communities = list(level_communities)
+            if level >= max_communities - 1:
+                break
+    except _TimeLimitReached:
+        pass
+
+    return _to_partition(communities)
+
+
+class _TimeLimitReached(Exception):
+    pass
+
+
+def _deadline(time_limit: Optional[float]) -> float:
+    return float("inf") if time_limit is None else time.perf_counter() + time_limit
+
+
+def _to_partition(communities: Iterable[Iterable[Any]]) -> Partition:
+    return {
+        node: idx
+        for idx, community in enumerate(communities)
+        for node in community
+    }
+
+
+def _partition_modularity(graph: nx.Graph, partition: Partition, weight: str) -> float:
+    communities: Dict[int, set] = {}
+    for node, community_id in partition.items():
+        communities.setdefault(community_id, set()).add(node)
+    return _communities_modularity(graph, communities.values(), weight)
+
+
+def _communities_modularity(graph: nx.Graph, communities, weight: str) -> float:
+    if graph.number_of_edges() == 0:
+        return 0.0
+    return modularity(graph, communities, weight=weight)
@@ -1,3 +1,4 @@
+import os
 from enum import Enum
 
 class NodeSizeMetric(str, Enum):
@@ -9,3 +10,70 @@ class NodeSizeMetric(str, Enum):
     @classmethod
     def list(cls):
         return list(map(lambda c: c.value, cls))
+
+
+class NodeSizeScale(str, Enum):
+    LINEAR = "Linear"
+    LOG = "Logarithmic"
+    QUANTILE = "Quantile"
+
+    @classmethod
+    def list(cls):
+        return list(map(lambda c: c.value, cls))
+
+
+class CentralityMode(str, Enum):
+    AUTO = "Auto"
+    EXACT = "Exact"
+    APPROXIMATE = "Approximate"
+
+    @classmethod
+    def list(cls):
+        return list(map(lambda c: c.value, cls))
+
+
+class MetricsBackend(str, Enum):
+    SPARSE = "Sparse matrices (SciPy)"
+    NETWORKX = "NetworkX"
+
+    @classmethod
+    def list(cls):
+        return list(map(lambda c: c.value, cls))
+
+
+class RenderMode(str, Enum):
+    AUTO = "Auto"
+    PYVIS = "Interactive (pyvis)"
+    WEBGL = "Fast (WebGL)"
+
+    @classmethod
+    def list(cls):
+        return list(map(lambda c: c.value, cls))
+
+
+class SamplingStrategy(str, Enum):
+    TOP_DEGREE_EGO = "Top-degree ego networks"
+    FOREST_FIRE = "Forest fire"
+    RANDOM_WALK = "Random walk"
+    EDGE_STRATIFIED = "Edge-stratified"
+
+    @classmethod
+    def list(cls):
+        return list(map(lambda c: c.value, cls))
+
+
+# Above this many users, "Auto" centrality mode switches to sampled estimates.
+# The graph view shows at most 1000 users, so this has to stay well below that.
+APPROX_CENTRALITY_NODE_THRESHOLD = 500
+DEFAULT_CENTRALITY_SAMPLES = 256
+# Processes used for closeness and betweenness; 1 computes them in the app process.
+DEFAULT_CENTRALITY_WORKERS = int(os.environ.get("ISMD_CENTRALITY_WORKERS", 1))
+DEFAULT_SEED = 42
+# Above this many edges, "Auto" rendering switches from pyvis physics to the WebGL renderer.
+WEBGL_RENDER_EDGE_THRESHOLD = 2000
+# Rows per chunk when a CSV is streamed into a network.
+DEFAULT_CHUNK_SIZE = 100_000
+# Page sizes offered for the "Filter by User" table; only the visible page is sent to the browser.
+TABLE_PAGE_SIZES = (25, 100, 500)
+# Seconds between checks for finished background jobs in the graph view.
+JOB_POLL_INTERVAL = 0.5
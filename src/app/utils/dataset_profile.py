@@ -0,0 +1,54 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import pandas as pd
+
+TOP_USERS_COUNT = 10
+
+
+@dataclass(frozen=True)
+class DatasetProfile:
+    """
+    Summaries shown by the Data Exploration view, computed once per dataset.
+
+    `tweets_per_day` is None when the dataset has no "tweet_created" column.
+    """
+
+    description: pd.DataFrame
+    dtypes: pd.Series
+    missing_values: pd.Series
+    top_users: pd.Series
+    tweets_per_day: Optional[pd.Series]
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "DatasetProfile":
+        missing = df.isnull().sum()
+
+        return cls(
+            description=df.describe(include="all"),
+            dtypes=df.dtypes,
+            missing_values=missing[missing > 0],
+            top_users=(
+                df["name"].value_counts().head(TOP_USERS_COUNT)
+                if "name" in df.columns
+                else pd.Series(dtype="int64")
+            ),
+            tweets_per_day=(
+                tweets_per_day(df["tweet_created"])
+                if "tweet_created" in df.columns
+                else None
+            ),
+        )
+
+
+def tweets_per_day(created: pd.Series) -> pd.Series:
+    """Number of tweets per calendar day, in the time zone the timestamps were written in."""
+    timestamps = pd.to_datetime(created, format="mixed", errors="coerce")
+    if timestamps.dtype == object:
+        # Mixed UTC offsets do not fit one dtype; fall back to UTC days.
+        timestamps = pd.to_datetime(created, format="mixed", errors="coerce", utc=True)
+    if isinstance(timestamps.dtype, pd.DatetimeTZDtype):
+        timestamps = timestamps.dt.tz_localize(None)
+
+    days = timestamps.dt.floor("D").rename("tweet_created")
+    return days.value_counts(sort=False).sort_index()
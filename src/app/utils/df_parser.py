@@ -1,39 +1,171 @@
-from typing import Iterable
+from typing import Iterable, Optional
 
+import numpy as np
 import pandas as pd
 
-from src.app.model import SocialInteraction, Tweet, User
+from src.app.utils.text_entities import TextEntities, extract_entities
 
 _EXPECTED_COLUMNS = ["who", "to_whom", "interaction_type"]
+_TIMESTAMP_COLUMNS = ["tweet_created", "timestamp", "created_at"]
 
 
-def parse_dataframe(df: pd.DataFrame) -> Iterable[SocialInteraction]:
+def _check_expected_columns(df: pd.DataFrame):
     missing = [col for col in _EXPECTED_COLUMNS if col not in df.columns]
     if missing:
         raise ValueError(f"Missing required column(s): {missing}")
 
-    for _, row in df.iterrows():
-        yield _row_to_social_interaction(row)
 
+def get_mention_edges(
+    df: pd.DataFrame, entities: Optional[TextEntities] = None
+) -> pd.DataFrame:
+    """
+    Extract one (author, mentioned user) edge per mention for the whole text column at once.
 
-def _row_to_social_interaction(row: pd.Series) -> SocialInteraction:
-    return SocialInteraction(
-        who_id=str(row["who"]),
-        to_whom_id=str(row["to_whom"]),
-        interaction_type=str(row["interaction_type"]),
-        who_username=row.get("who_username"),
-        to_whom_username=row.get("to_whom_username"),
-        item=row.get("item"),
+    `entities` can pass in the result of `extract_entities` on the text column when
+    it was already computed. Returns an edge frame with the `_EDGE_COLUMNS` columns,
+    in row order.
+    """
+    if entities is None:
+        entities = extract_entities(get_text_column(df))
+    mentions = entities.mentions
+    authors = df["name"].to_numpy(dtype=object)
+    has_author = pd.notna(authors[mentions.rows])
+    positions = mentions.rows[has_author]
+
+    return pd.DataFrame(
+        {
+            "source": authors[positions],
+            "target": mentions.values()[has_author],
+            "interaction_type": "mention",
+            "timestamp": _get_timestamps(df)[positions],
+            "tweet": df.index.to_numpy()[positions],
+        }
     )
 
 
-def get_users(df: pd.DataFrame) -> dict[str, User]:
-    return {username: User(username) for username in df.name.unique()}
+def get_text_column(df: pd.DataFrame) -> pd.Series:
+    return df["text" if "text" in df.columns else "content"]
+
+
+def is_dataframe_with_content(df: pd.DataFrame) -> bool:
+    cols = df.columns
+    return ("text" in cols or "content" in cols) and "name" in cols
+
+
+def get_network_edges(
+    df: pd.DataFrame, entities: Optional[TextEntities] = None
+) -> tuple[np.ndarray, pd.DataFrame]:
+    """
+    Users and edges of a DataFrame in either supported schema.
+
+    Returns the usernames that must appear as nodes even without edges (tweet
+    authors) and the edge frame from `get_mention_edges`/`get_interaction_edges`.
+    `entities` is passed on to `get_mention_edges`.
+    """
+    if is_dataframe_with_content(df):
+        return df["name"].dropna().unique(), get_mention_edges(df, entities)
+
+    return np.empty(0, dtype=object), get_interaction_edges(df)
+
+
+def get_network_columns(columns: Iterable[str], with_content: bool) -> list[str]:
+    """Columns of a CSV export that are needed to build the user network."""
+    if with_content:
+        wanted = ["name", "text" if "text" in columns else "content"]
+    else:
+        wanted = _EXPECTED_COLUMNS + ["who_username", "to_whom_username"]
+
+    timestamp_col = next((col for col in _TIMESTAMP_COLUMNS if col in columns), None)
+    if timestamp_col is not None:
+        wanted.append(timestamp_col)
+
+    return [col for col in wanted if col in columns]
+
+
+def get_interaction_edges(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Extract one (who, to_whom) edge per row of an interaction-list DataFrame.
+
+    The username columns take precedence over the id columns when present.
+    """
+    _check_expected_columns(df)
+
+    return pd.DataFrame(
+        {
+            "source": _resolve_user_column(df, "who", "who_username"),
+            "target": _resolve_user_column(df, "to_whom", "to_whom_username"),
+            "interaction_type": df["interaction_type"].astype(str).to_numpy(dtype=object),
+            "timestamp": _get_timestamps(df),
+            "tweet": df.index.to_numpy(),
+        }
+    )
+
+
+def aggregate_edges(edges: pd.DataFrame) -> pd.DataFrame:
+    """
+    Collapse an edge frame into one row per undirected user pair.
+
+    The result has "source" and "target" columns plus the edge attributes used by
+    `UserNetwork`: "weight", "interaction_types", "first_timestamp",
+    "last_timestamp" (UTC, NaT when unknown) and "tweets".
+    """
+    if edges.empty:
+        return pd.DataFrame(
+            {
+                "source": np.empty(0, object),
+                "target": np.empty(0, object),
+                "first_timestamp": np.empty(0, "datetime64[ns]"),
+                "last_timestamp": np.empty(0, "datetime64[ns]"),
+                "weight": np.empty(0, np.int64),
+                "tweets": np.empty(0, object),
+                "interaction_types": np.empty(0, object),
+            }
+        )
+
+    sources = edges["source"].to_numpy(dtype=object)
+    targets = edges["target"].to_numpy(dtype=object)
+    swap = sources > targets
+    edges = edges.assign(
+        source=np.where(swap, targets, sources), target=np.where(swap, sources, targets)
+    )
+
+    grouped = edges.groupby(["source", "target"], sort=False)
+    codes = grouped.ngroup().to_numpy()
+    weights = np.bincount(codes, minlength=grouped.ngroups)
+
+    aggregated = grouped["timestamp"].agg(["min", "max"])
+    aggregated.columns = ["first_timestamp", "last_timestamp"]
+    aggregated["weight"] = weights
+
+    order = np.argsort(codes, kind="stable")
+    tweets = edges["tweet"].to_numpy()[order]
+    aggregated["tweets"] = [
+        group.tolist() for group in np.split(tweets, np.cumsum(weights)[:-1])
+    ]
+
+    interaction_types = [{} for _ in range(grouped.ngroups)]
+    type_counts = pd.Series(edges["interaction_type"].to_numpy()).groupby(codes).value_counts()
+    for (code, interaction_type), count in type_counts.items():
+        interaction_types[code][interaction_type] = int(count)
+    aggregated["interaction_types"] = interaction_types
+
+    return aggregated.reset_index()
+
+
+def _get_timestamps(df: pd.DataFrame) -> np.ndarray:
+    col = next((col for col in _TIMESTAMP_COLUMNS if col in df.columns), None)
+    if col is None:
+        return np.full(len(df), np.datetime64("NaT"), dtype="datetime64[ns]")
+
+    timestamps = pd.to_datetime(df[col], errors="coerce", utc=True, format="mixed")
+    return timestamps.dt.tz_convert(None).to_numpy(dtype="datetime64[ns]")
 
 
-def iterate_tweets(df: pd.DataFrame) -> Iterable[Tweet]:
-    for _, row in df.iterrows():
-        content = row.get("text")
-        username = row.get("name")
+def _resolve_user_column(df: pd.DataFrame, id_col: str, username_col: str) -> np.ndarray:
+    names = df[id_col].astype(str)
+    if username_col in df.columns:
+        usernames = df[username_col]
+        has_username = usernames.notna() & (usernames.astype(str) != "")
+        names = usernames.astype(str).where(has_username, names)
 
-        yield Tweet(content, username)
+    return names.to_numpy(dtype=object)
@@ -0,0 +1,90 @@
+"""
+Background jobs for the expensive stages of the graph view.
+
+Jobs run on a shared thread pool so the Streamlit script can render what is
+already available and poll for the rest. Each session keeps one job per named
+slot in a `JobBoard`; submitting a job with different inputs to a slot cancels
+the previous one. Cancellation is cooperative: a job that has not started is
+dropped, and a running job gets its `cancelled` event as a keyword argument and
+can stop between its stages with `raise_if_cancelled`.
+"""
+
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List
+
+from src.app.utils import profiling
+
+BACKGROUND_WORKERS = 2
+
+_executor = ThreadPoolExecutor(
+    max_workers=BACKGROUND_WORKERS, thread_name_prefix="graph-job"
+)
+
+
+class Job:
+    """
+    `fn(*args, cancelled=<threading.Event>, **kwargs)` running on the background
+    pool, identified by `key`.
+    """
+
+    def __init__(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs):
+        self.key = key
+        self.cancelled = threading.Event()
+        # Stages timed inside the job when profiling was on at submission.
+        self.timings: List[profiling.StageTiming] = []
+        self.__profiled = profiling.is_enabled()
+        self.future: Future = _executor.submit(self.__run, fn, args, kwargs)
+
+    def __run(self, fn, args, kwargs):
+        raise_if_cancelled(self.cancelled)
+        profiling.reset(self.__profiled)
+        try:
+            return fn(*args, cancelled=self.cancelled, **kwargs)
+        finally:
+            self.timings = profiling.get_timings()
+
+    def cancel(self):
+        self.cancelled.set()
+        self.future.cancel()
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self) -> Any:
+        """Result of the job, waiting for it if needed; re-raises its exception."""
+        return self.future.result()
+
+
+class JobBoard:
+    """The latest job of every named slot of one session."""
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+
+    def submit(
+        self, slot: str, key: Hashable, fn: Callable[..., Any], *args, **kwargs
+    ) -> Job:
+        """
+        Start `fn(*args, **kwargs)` in `slot` unless the job there already has `key`.
+
+        A job with another key in the slot is cancelled and replaced.
+        """
+        job = self._jobs.get(slot)
+        if job is not None and job.key == key and not job.future.cancelled():
+            return job
+        if job is not None:
+            job.cancel()
+
+        job = self._jobs[slot] = Job(key, fn, *args, **kwargs)
+        return job
+
+    def cancel_all(self):
+        for job in self._jobs.values():
+            job.cancel()
+        self._jobs.clear()
+
+
+def raise_if_cancelled(cancelled: threading.Event):
+    if cancelled.is_set():
+        raise CancelledError()
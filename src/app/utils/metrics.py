@@ -0,0 +1,395 @@
+import itertools
+import math
+import random
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+
+import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+
+from src.app.utils import parallel, profiling
+from src.app.utils.brandes import source_dependencies
+from src.app.utils.constants import (
+    APPROX_CENTRALITY_NODE_THRESHOLD,
+    CentralityMode,
+    MetricsBackend,
+)
+from src.app.utils.sparse_metrics import SPARSE_METRICS, as_node_dict
+
+
+@dataclass(frozen=True)
+class CentralityOptions:
+    """
+    How closeness and betweenness are computed.
+
+    In approximate mode both are estimated from `samples` BFS sources picked with
+    a fixed `seed`, so the accuracy/time trade-off is controlled by `samples` and
+    repeated runs give identical results.
+
+    `workers` processes share the BFS runs, and `backend` (a `MetricsBackend`)
+    computes PageRank, triangles and clustering. Neither changes the results, so
+    they are not part of the options' identity.
+    """
+
+    approximate: bool = False
+    samples: int = 256
+    seed: int = 42
+    workers: int = field(default=1, compare=False)
+    backend: str = field(default=MetricsBackend.SPARSE.value, compare=False)
+
+    @classmethod
+    def for_mode(
+        cls,
+        mode: str,
+        nodes_count: int,
+        samples: int,
+        seed: int,
+        workers: int = 1,
+        backend: str = MetricsBackend.SPARSE.value,
+    ) -> "CentralityOptions":
+        """Options for a `CentralityMode`; "Auto" is approximate above the node threshold."""
+        if mode == CentralityMode.AUTO:
+            approximate = nodes_count > APPROX_CENTRALITY_NODE_THRESHOLD
+        else:
+            approximate = mode == CentralityMode.APPROXIMATE
+        return cls(
+            approximate=approximate,
+            samples=samples,
+            seed=seed,
+            workers=workers,
+            backend=backend,
+        )
+
+    def describe(self) -> str:
+        mode = (
+            "exact"
+            if not self.approximate
+            else f"approximate ({self.samples} sampled sources, seed {self.seed})"
+        )
+        if self.workers > 1:
+            return f"{mode}, {self.workers} workers"
+        return mode
+
+
+def betweenness_centrality(graph: nx.Graph, workers: int = 1) -> Dict[Any, float]:
+    """
+    `nx.betweenness_centrality(graph)`, to the last bit, with the BFS runs shared
+    among `workers` processes.
+    """
+    return _betweenness_from_sources(graph, list(graph), None, workers)
+
+
+def closeness_centrality(graph: nx.Graph, workers: int = 1) -> Dict[Any, float]:
+    """
+    `nx.closeness_centrality(graph)`, to the last bit, with the BFS runs shared
+    among `workers` processes.
+    """
+    n = len(graph)
+    chunks = parallel.chunk_plan(range(n))
+    partials = parallel.map_chunks(
+        _closeness_chunk, parallel.adjacency_lists(graph), chunks, workers
+    )
+    return dict(zip(graph, itertools.chain.from_iterable(partials)))
+
+
+def approximate_betweenness_centrality(
+    graph: nx.Graph, samples: int, seed: int, workers: int = 1
+) -> Dict[Any, float]:
+    """
+    `nx.betweenness_centrality(graph, k=samples, seed=seed)`, to the last bit:
+    betweenness centrality estimated from `samples` random pivot nodes.
+    """
+    if samples >= len(graph):
+        return betweenness_centrality(graph, workers)
+    pivots = random.Random(seed).sample(list(graph), samples)
+    return _betweenness_from_sources(graph, pivots, pivots, workers)
+
+
+def approximate_closeness_centrality(
+    graph: nx.Graph, samples: int, seed: int, workers: int = 1
+) -> Dict[Any, float]:
+    """
+    Closeness centrality estimated from BFS runs started at sampled sources.
+
+    The average distance of a node to the rest of its component is estimated from
+    its distances to up to `samples` sources of that component; components with at
+    most `samples` nodes are computed exactly. Uses the same Wasserman-Faust scaling
+    for disconnected graphs as `nx.closeness_centrality`.
+    """
+    n = len(graph)
+    if n <= 1:
+        return {node: 0.0 for node in graph}
+
+    rng = random.Random(seed)
+    position = {node: idx for idx, node in enumerate(graph)}
+    components = []
+    sources = []
+    for component in nx.connected_components(graph):
+        nodes = sorted(component, key=position.__getitem__)
+        components.append(nodes)
+        sources.extend(nodes if len(nodes) <= samples else rng.sample(nodes, samples))
+
+    # Distance sums and counts are integers, so merging the chunks is exact.
+    adjacency = parallel.adjacency_lists(graph)
+    chunks = parallel.chunk_plan([position[source] for source in sources])
+    partials = list(
+        parallel.map_chunks(_distance_sums_chunk, adjacency, chunks, workers)
+    )
+    total_distance = sum(distances for distances, _ in partials)
+    reached_from = sum(reached for _, reached in partials)
+
+    closeness = {}
+    for nodes in components:
+        size = len(nodes)
+        for node in nodes:
+            idx = position[node]
+            if size > samples and reached_from[idx] == 0:
+                total_distance[idx] = sum(_distances(adjacency, idx).values())
+                reached_from[idx] = size - 1
+
+            if total_distance[idx] == 0:
+                closeness[node] = 0.0
+                continue
+            average_distance = int(total_distance[idx]) / int(reached_from[idx])
+            closeness[node] = (1 / average_distance) * (size - 1) / (n - 1)
+
+    return closeness
+
+
+# Upper bound on the dependency values (8 bytes each) one chunk of betweenness
+# sources returns, so that large graphs are split into more chunks.
+_MAX_CHUNK_DEPENDENCIES = 1 << 21
+
+
+def _betweenness_from_sources(
+    graph: nx.Graph, sources: list, pivots: Optional[list], workers: int
+) -> Dict[Any, float]:
+    n = len(graph)
+    position = {node: idx for idx, node in enumerate(graph)}
+    chunks = parallel.chunk_plan(
+        [position[source] for source in sources],
+        max(parallel.PLAN_CHUNKS, len(sources) * n // _MAX_CHUNK_DEPENDENCIES + 1),
+    )
+    partials = parallel.map_chunks(
+        source_dependencies, parallel.adjacency_lists(graph), chunks, workers
+    )
+
+    # Added one source at a time in source order, as NetworkX adds them, so every
+    # sum is the same float whatever the chunks and workers.
+    betweenness = np.zeros(n)
+    for dependencies in partials:
+        for row in dependencies:
+            betweenness += row
+
+    # NetworkX's normalization without endpoints; sampled pivots lie on fewer
+    # of the sampled paths than the other nodes.
+    pairs = n - 1
+    if pairs >= 2:
+        if pivots is None:
+            betweenness *= 1 / (pairs * (pairs - 1))
+        else:
+            k = len(pivots)
+            scale = np.full(n, 1 / (k * (pairs - 1)))
+            scale[[position[pivot] for pivot in pivots]] = (
+                1 / ((k - 1) * (pairs - 1)) if k > 1 else math.nan
+            )
+            betweenness *= scale
+    return dict(zip(graph, betweenness.tolist()))
+
+
+def _closeness_chunk(
+    adjacency: parallel.Adjacency, nodes: List[int]
+) -> List[float]:
+    n = len(adjacency)
+    closeness = []
+    for node in nodes:
+        distances = _distances(adjacency, node)
+        total = sum(distances.values())
+        value = 0.0
+        if total > 0 and n > 1:
+            # Same operations as NetworkX, so the same floats.
+            value = (len(distances) - 1.0) / total
+            value *= (len(distances) - 1.0) / (n - 1)
+        closeness.append(value)
+    return closeness
+
+
+def _distance_sums_chunk(
+    adjacency: parallel.Adjacency, sources: List[int]
+) -> tuple:
+    """Per node sum of distances to `sources` and number of them reached."""
+    total_distance = np.zeros(len(adjacency), dtype=np.int64)
+    reached_from = np.zeros(len(adjacency), dtype=np.int64)
+    for source in sources:
+        distances = _distances(adjacency, source)
+        del distances[source]
+        reached = np.fromiter(distances, dtype=np.int64, count=len(distances))
+        total_distance[reached] += np.fromiter(
+            distances.values(), dtype=np.int64, count=len(distances)
+        )
+        reached_from[reached] += 1
+    return total_distance, reached_from
+
+
+def _distances(adjacency: parallel.Adjacency, source: int) -> Dict[int, int]:
+    """BFS distances from `source` to every node it reaches, itself included."""
+    distances = {source: 0}
+    frontier = [source]
+    distance = 0
+    while frontier:
+        distance += 1
+        next_frontier = []
+        for node in frontier:
+            for neighbour in adjacency[node]:
+                if neighbour not in distances:
+                    distances[neighbour] = distance
+                    next_frontier.append(neighbour)
+        frontier = next_frontier
+    return distances
+
+
+GRAPH_METRICS: Dict[str, Callable[[nx.Graph], Dict[Any, float]]] = {
+    "pagerank": nx.pagerank,
+    "degree_centrality": nx.degree_centrality,
+    "closeness_centrality": closeness_centrality,
+    "betweenness_centrality": betweenness_centrality,
+    "triadic_closure": nx.triangles,
+    "clustering_coefficient": nx.clustering,
+}
+
+APPROXIMATE_METRICS: Dict[str, Callable[..., Dict[Any, float]]] = {
+    "closeness_centrality": approximate_closeness_centrality,
+    "betweenness_centrality": approximate_betweenness_centrality,
+}
+
+
+class GraphStats(Mapping):
+    """
+    Read-only mapping of metric name to per-node values that computes each metric
+    only on first access and keeps the result for the lifetime of the object.
+
+    `version` identifies the graph state the values were computed for; the owner
+    is expected to replace the object once its graph changes or the centrality
+    options change. Passing the replaced object as `previous` keeps every metric
+    that is still valid, i.e. all metrics not affected by the centrality options
+    when only the options changed.
+
+    When `adjacency`, the CSR adjacency matrix of `graph` with node i as row i, is
+    given and the options select the sparse backend, the `SPARSE_METRICS` are
+    computed from it with sparse matrix operations. Both backends give the same
+    values (PageRank up to its convergence tolerance).
+
+    The object can be shared by callers whose options are equal but ask for
+    different workers or backends: `compute` takes the caller's options, while
+    indexing uses the options the object was created with. It is thread-safe:
+    callers asking for a metric that is being computed wait for that result.
+    """
+
+    def __init__(
+        self,
+        graph: nx.Graph,
+        version: Hashable,
+        centrality_options: CentralityOptions = CentralityOptions(),
+        previous: Optional["GraphStats"] = None,
+        adjacency: Optional[sp.csr_array] = None,
+    ):
+        self.graph = graph
+        self.version = version
+        self.centrality_options = centrality_options
+        self.adjacency = adjacency
+        self._values: Dict[str, Dict[Any, float]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        if previous is not None:
+            self.__inherit(previous)
+
+    @property
+    def key(self) -> Hashable:
+        return self.version, self.centrality_options
+
+    def __getitem__(self, name: str) -> Dict[Any, float]:
+        return self.compute(name)
+
+    def compute(
+        self, name: str, options: Optional[CentralityOptions] = None
+    ) -> Dict[Any, float]:
+        """
+        Values of metric `name`, computed with the workers and backend of `options`
+        (by default the object's options) unless they are already known.
+        """
+        values = self._values.get(name)
+        if values is None:
+            if name not in GRAPH_METRICS:
+                raise KeyError(name)
+            with self._locks.setdefault(name, threading.Lock()):
+                values = self._values.get(name)
+                if values is None:
+                    values = self.__compute(name, options or self.centrality_options)
+                    self._values[name] = values
+        return values
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(GRAPH_METRICS)
+
+    def __len__(self) -> int:
+        return len(GRAPH_METRICS)
+
+    def is_computed(self, name: str) -> bool:
+        return name in self._values
+
+    def __inherit(self, previous: "GraphStats"):
+        if previous.version == self.version:
+            self._values = {
+                name: values
+                for name, values in list(previous._values.items())
+                if name not in APPROXIMATE_METRICS
+                or previous.centrality_options == self.centrality_options
+            }
+
+    def __compute(self, name: str, options: CentralityOptions) -> Dict[Any, float]:
+        sparse = options.backend == MetricsBackend.SPARSE and self.adjacency is not None
+        with profiling.stage(f"metric:{name}"):
+            if options.approximate and name in APPROXIMATE_METRICS:
+                return APPROXIMATE_METRICS[name](
+                    self.graph, options.samples, options.seed, options.workers
+                )
+            if name in APPROXIMATE_METRICS:
+                return GRAPH_METRICS[name](self.graph, options.workers)
+            if sparse and name in SPARSE_METRICS:
+                return as_node_dict(SPARSE_METRICS[name](self.adjacency))
+            return GRAPH_METRICS[name](self.graph)
+
+
+class MetricValues:
+    """
+    Values of a node metric aligned with node ids (0, 1, 2, ...), with the bounds
+    and the sorted values (for rank-based scaling) computed once.
+    """
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+        self.min = float(values.min()) if len(values) else 0.0
+        self.max = float(values.max()) if len(values) else 0.0
+
+    def __len__(self):
+        return len(self.values)
+
+    @cached_property
+    def sorted_values(self) -> np.ndarray:
+        return np.sort(self.values)
+
+    def ranks(self, values: np.ndarray) -> np.ndarray:
+        """
+        Mid-rank of `values` among all values, scaled to [0, 1]: the smallest value
+        maps to 0, the largest to 1 and tied values share the middle of their ranks.
+        """
+        count = len(self.sorted_values)
+        if count < 2:
+            return np.full(len(values), 0.5)
+
+        below = np.searchsorted(self.sorted_values, values, side="left")
+        up_to = np.searchsorted(self.sorted_values, values, side="right")
+        return (below + up_to - 1) / (2 * (count - 1))
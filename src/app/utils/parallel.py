@@ -0,0 +1,163 @@
+"""
+Process pool over chunks of source nodes for the per-source graph algorithms
+(betweenness, closeness).
+
+Algorithms run on positional adjacency lists (`adjacency_lists`): node i of the
+graph in NetworkX iteration order is position i, with its neighbours in the order
+NetworkX iterates them, so a BFS visits nodes exactly as NetworkX's does.
+
+For a parallel call the graph is written once, as CSR arrays, to a shared memory
+block that every worker reads in place; tasks only carry the block's name and
+their chunk of sources. The pool is started on first use with the "forkserver"
+start method ("spawn" where it is not available), kept for later calls and shut
+down at exit. Forking from the app's threads is unsafe, and starting processes
+for every call costs more than most graphs of the graph view take to compute.
+Results come back in chunk order, so callers can merge them exactly as a single
+process would.
+"""
+
+import atexit
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterator, List, Sequence, TypeVar
+
+import networkx as nx
+import numpy as np
+
+# Number of chunks the sources are split into, independent of the worker count.
+PLAN_CHUNKS = 64
+# Below this many nodes, sending the work to other processes costs more than it
+# saves. `benchmarks/parallel_threshold.py` measures a fixed cost of about 10-15 ms
+# per parallel call, so 2 workers pay off once the serial run takes about 25 ms:
+# from about 300 nodes for exact closeness, the cheapest of the algorithms
+# (about 150 for betweenness), on graphs as sparse as the sampled networks.
+PARALLEL_MIN_NODES = 300
+
+T = TypeVar("T")
+Adjacency = Sequence[Sequence[int]]
+
+_executors: Dict[int, ProcessPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def adjacency_lists(graph: nx.Graph) -> List[List[int]]:
+    """Neighbours of every node by position, both in NetworkX iteration order."""
+    position = {node: idx for idx, node in enumerate(graph)}
+    return [[position[neighbour] for neighbour in graph[node]] for node in graph]
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on: its affinity mask where the OS has one."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def chunk_plan(sources: Sequence[Any], chunks: int = PLAN_CHUNKS) -> List[list]:
+    """Split `sources` into at most `chunks` contiguous, equally sized chunks."""
+    sources = list(sources)
+    size = max(1, -(-len(sources) // chunks))
+    return [sources[start : start + size] for start in range(0, len(sources), size)]
+
+
+def map_chunks(
+    fn: Callable[[Adjacency, list], T],
+    adjacency: List[List[int]],
+    chunks: List[list],
+    workers: int,
+) -> Iterator[T]:
+    """
+    `fn(adjacency, chunk)` for every chunk, in chunk order, computed on up to
+    `workers` processes (no more than there are CPUs to run them).
+
+    `fn` must be a module-level function so that it can be sent to the workers,
+    and must only read `adjacency`: in a worker, its neighbour lists are read-only
+    views of shared memory.
+    """
+    workers = min(workers, len(chunks), available_cpus())
+    if workers <= 1 or len(adjacency) < PARALLEL_MIN_NODES:
+        for chunk in chunks:
+            yield fn(adjacency, chunk)
+        return
+
+    block = _share(adjacency)
+    try:
+        executor = _get_executor(workers)
+        try:
+            yield from executor.map(
+                _run_chunk, itertools.repeat(fn), itertools.repeat(block.name), chunks
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); the next call starts a new pool.
+            with _executors_lock:
+                if _executors.get(workers) is executor:
+                    del _executors[workers]
+            raise
+    finally:
+        block.close()
+        block.unlink()
+
+
+@atexit.register
+def shutdown():
+    """Stop the worker processes; the next parallel call starts new ones."""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(cancel_futures=True)
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    with _executors_lock:
+        executor = _executors.get(workers)
+        if executor is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in methods else "spawn"
+            )
+            executor = _executors[workers] = ProcessPoolExecutor(
+                workers, mp_context=context
+            )
+        return executor
+
+
+def _share(adjacency: List[List[int]]) -> shared_memory.SharedMemory:
+    """Shared memory block with [nodes, edges, indptr..., indices...] as int64."""
+    nodes = len(adjacency)
+    lengths = np.fromiter(map(len, adjacency), dtype=np.int64, count=nodes)
+    edges = int(lengths.sum())
+    block = shared_memory.SharedMemory(create=True, size=(nodes + edges + 3) * 8)
+    values = np.ndarray(nodes + edges + 3, dtype=np.int64, buffer=block.buf)
+    values[:2] = nodes, edges
+    values[2] = 0
+    np.cumsum(lengths, out=values[3 : nodes + 3])
+    values[nodes + 3 :] = np.fromiter(
+        itertools.chain.from_iterable(adjacency), dtype=np.int64, count=edges
+    )
+    del values
+    return block
+
+
+def _run_chunk(fn, name, chunk):
+    block = shared_memory.SharedMemory(name=name)
+    views = [block.buf.cast("q")]
+    try:
+        values = views[0]
+        nodes, edges = values[0], values[1]
+        indptr = values[2 : nodes + 3].tolist()
+        indices = values[nodes + 3 : nodes + 3 + edges]
+        # Views into the shared block: the neighbours are not copied.
+        adjacency = [indices[start:stop] for start, stop in zip(indptr, indptr[1:])]
+        views += [indices, *adjacency]
+        return fn(adjacency, chunk)
+    finally:
+        # The block can only be closed once no view of it is left.
+        for view in reversed(views):
+            view.release()
+        block.close()
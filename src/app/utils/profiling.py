@@ -0,0 +1,140 @@
+"""
+Lightweight per-stage timing of the analysis hot path.
+
+Profiling is off by default; `stage()` then returns a shared no-op context
+manager, so instrumented code pays one function call and a flag check. State is
+thread-local because Streamlit runs every session's script in its own thread.
+"""
+
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass
+from functools import wraps
+from typing import Callable, List
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger("ismd.performance")
+
+_NULL_CONTEXT = nullcontext()
+# ru_maxrss is reported in kilobytes on Linux and in bytes on macOS.
+_MAXRSS_TO_MB = 1 / 2**20 if sys.platform == "darwin" else 1 / 2**10
+
+
+@dataclass
+class StageTiming:
+    stage: str
+    depth: int
+    seconds: float
+    peak_rss_growth_mb: float
+
+
+class _State(threading.local):
+    def __init__(self):
+        self.enabled = False
+        self.depth = 0
+        self.timings: List[StageTiming] = []
+        self.started_at = time.perf_counter()
+
+
+_state = _State()
+
+
+def reset(enabled: bool):
+    """Start a new profile (e.g. at the beginning of a rerun) and turn profiling on or off."""
+    _state.enabled = enabled
+    _state.depth = 0
+    _state.timings = []
+    _state.started_at = time.perf_counter()
+
+
+def is_enabled() -> bool:
+    return _state.enabled
+
+
+def stage(name: str):
+    """Context manager that records the wall time of the enclosed block when profiling is on."""
+    if not _state.enabled:
+        return _NULL_CONTEXT
+    return _timed_stage(name)
+
+
+def profiled(name: str) -> Callable:
+    """Decorator version of `stage`."""
+
+    def decorator(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def get_timings() -> List[StageTiming]:
+    return list(_state.timings)
+
+
+def extend(timings: List[StageTiming], prefix: str = ""):
+    """Add stages timed elsewhere (e.g. in a background job) under the current stage."""
+    if not _state.enabled:
+        return
+    for timing in timings:
+        _state.timings.append(
+            StageTiming(
+                stage=prefix + timing.stage,
+                depth=_state.depth + timing.depth,
+                seconds=timing.seconds,
+                peak_rss_growth_mb=timing.peak_rss_growth_mb,
+            )
+        )
+
+
+def elapsed() -> float:
+    """Seconds since the last `reset`."""
+    return time.perf_counter() - _state.started_at
+
+
+def to_json_lines(timings: List[StageTiming]) -> str:
+    return "\n".join(json.dumps(asdict(timing)) for timing in timings)
+
+
+def log_timings(timings: List[StageTiming]):
+    for timing in timings:
+        logger.info(json.dumps(asdict(timing)))
+
+
+@contextmanager
+def _timed_stage(name: str):
+    # Reserve the slot now so nested stages are listed after their parent.
+    index = len(_state.timings)
+    _state.timings.append(None)
+    depth = _state.depth
+    _state.depth += 1
+    rss_before = _peak_rss_mb()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _state.depth = depth
+        _state.timings[index] = StageTiming(
+            stage=name,
+            depth=depth,
+            seconds=time.perf_counter() - start,
+            peak_rss_growth_mb=_peak_rss_mb() - rss_before,
+        )
+
+
+def _peak_rss_mb() -> float:
+    if resource is None:
+        return 0.0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_TO_MB
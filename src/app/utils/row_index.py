@@ -0,0 +1,37 @@
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+
+class UserRowIndex:
+    """
+    Row positions of a DataFrame grouped by user, built once per dataset.
+
+    Users are factorized into codes and the row positions are stored sorted by
+    code, with `offsets[code]:offsets[code + 1]` delimiting a user's rows, so a
+    selection costs O(selected rows) instead of a scan of the whole column.
+    """
+
+    def __init__(self, names: pd.Series):
+        codes, users = pd.factorize(names, sort=True)
+        known = codes >= 0
+        known_codes = codes[known]
+
+        self.users = pd.Index(users)
+        self.rows = np.flatnonzero(known)[np.argsort(known_codes, kind="stable")]
+        self.offsets = np.zeros(len(users) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(known_codes, minlength=len(users)), out=self.offsets[1:])
+
+    def __len__(self):
+        return len(self.users)
+
+    def get_rows(self, users: Iterable[str]) -> np.ndarray:
+        """Positions of the rows of `users`, in table order; unknown users are ignored."""
+        codes = self.users.get_indexer(list(users))
+        codes = codes[codes >= 0]
+        rows = [self.rows[self.offsets[code] : self.offsets[code + 1]] for code in codes]
+        if not rows:
+            return np.empty(0, dtype=np.int64)
+
+        return np.sort(np.concatenate(rows))
@@ -0,0 +1,185 @@
+"""
+Graph-aware sampling of a user network down to a node budget.
+
+Every strategy is deterministic for a given seed, so a sample can be cached and
+reused between reruns. Strategies work on the CSR adjacency of `UserNetwork`
+and return the ids of the sampled users; `sample_network` turns them into the
+induced sub-network.
+"""
+
+from collections import deque
+from typing import Callable, Dict, Iterator
+
+import numpy as np
+
+from src.app.model import UserNetwork
+from src.app.utils.constants import DEFAULT_SEED, SamplingStrategy
+
+FOREST_FIRE_FORWARD_PROBABILITY = 0.7
+RANDOM_WALK_RESTART_PROBABILITY = 0.15
+# A walk that finds no new user for this many steps per sampled user jumps elsewhere.
+_RANDOM_WALK_STALL_STEPS = 100
+
+Sampler = Callable[[UserNetwork, int, np.random.Generator], np.ndarray]
+
+
+def sample_network(
+    network: UserNetwork, strategy: str, max_nodes: int, seed: int = DEFAULT_SEED
+) -> UserNetwork:
+    """Sub-network of at most `max_nodes` users chosen by a `SamplingStrategy`."""
+    if max_nodes >= network.number_of_users():
+        return network
+
+    sampler = SAMPLING_STRATEGIES[SamplingStrategy(strategy)]
+    return network.subnetwork(sampler(network, max_nodes, np.random.default_rng(seed)))
+
+
+def top_degree_ego_sample(
+    network: UserNetwork, max_nodes: int, rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Ego networks of the best connected users: hubs are taken in decreasing degree
+    order together with their neighbours (best connected first) until the budget
+    is used up. Ties are broken by user id, so `rng` is not needed.
+    """
+    degrees = network.degrees()
+    by_degree = np.argsort(-degrees, kind="stable")
+    selected = np.zeros(len(degrees), dtype=bool)
+    sample = []
+
+    for hub in by_degree:
+        if len(sample) >= max_nodes:
+            break
+        neighbours = network.neighbors(hub)
+        # A self-loop lists the hub among its own neighbours.
+        ego = np.concatenate(([hub], neighbours[neighbours != hub]))
+        ego = ego[~selected[ego]]
+        ego = ego[np.argsort(-degrees[ego], kind="stable")]
+        ego = ego[: max_nodes - len(sample)]
+        selected[ego] = True
+        sample.extend(ego.tolist())
+
+    return np.asarray(sample, dtype=np.int64)
+
+
+def forest_fire_sample(
+    network: UserNetwork,
+    max_nodes: int,
+    rng: np.random.Generator,
+    forward_probability: float = FOREST_FIRE_FORWARD_PROBABILITY,
+) -> np.ndarray:
+    """
+    Forest fire sampling (Leskovec & Faloutsos, 2006): from a random user, "burn"
+    a geometrically distributed number of unvisited neighbours and recurse into
+    them; when the fire dies out, restart from a new random user.
+    """
+    visited = np.zeros(network.number_of_users(), dtype=bool)
+    starts = _random_starts(len(visited), rng)
+    sample = []
+    frontier = deque()
+
+    while len(sample) < max_nodes:
+        if not frontier:
+            start = _next_unvisited(starts, visited)
+            visited[start] = True
+            sample.append(start)
+            frontier.append(start)
+            continue
+
+        user = frontier.popleft()
+        neighbours = network.neighbors(user)
+        neighbours = neighbours[~visited[neighbours]]
+        burned_count = rng.geometric(1 - forward_probability) - 1
+        burned = rng.permutation(neighbours)[: min(burned_count, max_nodes - len(sample))]
+        visited[burned] = True
+        sample.extend(burned.tolist())
+        frontier.extend(burned.tolist())
+
+    return np.asarray(sample, dtype=np.int64)
+
+
+def random_walk_sample(
+    network: UserNetwork,
+    max_nodes: int,
+    rng: np.random.Generator,
+    restart_probability: float = RANDOM_WALK_RESTART_PROBABILITY,
+) -> np.ndarray:
+    """
+    Random walk with restarts: the walk returns to its start user with
+    `restart_probability` at every step, and jumps to a new random start when it
+    is stuck (no neighbours, or no new user found for a long time).
+    """
+    csr = network.adjacency
+    visited = np.zeros(network.number_of_users(), dtype=bool)
+    starts = _random_starts(len(visited), rng)
+    start = user = _next_unvisited(starts, visited)
+    visited[start] = True
+    sample = [start]
+    stalled_steps = 0
+
+    while len(sample) < max_nodes:
+        begin, end = csr.indptr[user], csr.indptr[user + 1]
+        if begin == end or stalled_steps > _RANDOM_WALK_STALL_STEPS * max_nodes:
+            start = user = _next_unvisited(starts, visited)
+            stalled_steps = 0
+        elif rng.random() < restart_probability:
+            user = start
+            stalled_steps += 1
+            continue
+        else:
+            user = csr.indices[rng.integers(begin, end)]
+
+        if visited[user]:
+            stalled_steps += 1
+        else:
+            visited[user] = True
+            sample.append(user)
+            stalled_steps = 0
+
+    return np.asarray(sample, dtype=np.int64)
+
+
+def edge_stratified_sample(
+    network: UserNetwork, max_nodes: int, rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Sample edges evenly across edge-weight strata (powers of two) and keep their
+    endpoints, so the rare strong ties are as well represented as the many
+    one-off interactions. Users without edges are never sampled.
+    """
+    if network.number_of_edges() == 0:
+        return np.empty(0, dtype=np.int64)
+
+    csr = network.adjacency.tocoo()
+    upper = csr.row <= csr.col
+    sources, targets = csr.row[upper], csr.col[upper]
+    strata = np.floor(np.log2(csr.data[upper])).astype(np.int64)
+
+    # Shuffle, then take edges round-robin across strata: the i-th edge of every
+    # stratum comes before the (i + 1)-th edge of any stratum.
+    order = rng.permutation(len(strata))
+    order = order[np.argsort(strata[order], kind="stable")]
+    stratum_starts = np.searchsorted(strata[order], strata[order], side="left")
+    rank_in_stratum = np.arange(len(order)) - stratum_starts
+    order = order[np.argsort(rank_in_stratum, kind="stable")]
+
+    endpoints = np.column_stack((sources[order], targets[order])).ravel()
+    _, first_seen = np.unique(endpoints, return_index=True)
+    return endpoints[np.sort(first_seen)][:max_nodes]
+
+
+def _random_starts(users_count: int, rng: np.random.Generator) -> Iterator[int]:
+    """All users in random order, to draw fresh start users from."""
+    return iter(rng.permutation(users_count).tolist())
+
+
+def _next_unvisited(starts: Iterator[int], visited: np.ndarray) -> int:
+    return next(user for user in starts if not visited[user])
+
+
+SAMPLING_STRATEGIES: Dict[SamplingStrategy, Sampler] = {
+    SamplingStrategy.TOP_DEGREE_EGO: top_degree_ego_sample,
+    SamplingStrategy.FOREST_FIRE: forest_fire_sample,
+    SamplingStrategy.RANDOM_WALK: random_walk_sample,
+    SamplingStrategy.EDGE_STRATIFIED: edge_stratified_sample,
+}
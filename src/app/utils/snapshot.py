@@ -0,0 +1,344 @@
+"""
+On-disk snapshots of built networks, their metrics and their partitions.
+
+A snapshot is a directory named after the content hash of the source file
+(`hash_file`), with the snapshots of its samples below it (`snapshot_path`):
+
+    manifest.json                  format version, sizes and rows count
+    users.arrow                    usernames, row i is user id i
+    edges.arrow                    aggregated edge table with user ids
+    metrics/<options>/<name>.npy   metric arrays indexed by user id
+    partitions/<key>.arrow         node -> community, engine stats in the metadata
+
+Tables are uncompressed Arrow IPC files and metrics plain .npy files, so both
+are read through memory maps instead of being parsed. Every file is written to
+a temporary name and renamed into place, so concurrent readers never see a
+partial snapshot.
+
+Snapshots are kept within a size budget (`evict_snapshots`): past it, the
+datasets used least recently are removed as a whole.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+if TYPE_CHECKING:
+    from src.app.model import UserNetwork
+    from src.app.utils.community_engines import CommunityResult
+    from src.app.utils.metrics import CentralityOptions
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Where the dashboard and the batch analysis keep their snapshots.
+DEFAULT_SNAPSHOT_ROOT = Path(os.environ.get("ISMD_SNAPSHOT_DIR", "data/snapshots"))
+# Total size of the snapshots kept under a root, in bytes.
+DEFAULT_SNAPSHOT_MAX_BYTES = int(os.environ.get("ISMD_SNAPSHOT_MAX_BYTES", 2 * 2**30))
+
+_HASH_CHUNK_SIZE = 1 << 20
+
+_MANIFEST = "manifest.json"
+_USERS = "users.arrow"
+_EDGES = "edges.arrow"
+_METRICS = "metrics"
+_PARTITIONS = "partitions"
+
+_INTERACTION_TYPES = pa.map_(pa.string(), pa.int64())
+
+
+def hash_file(path: str) -> str:
+    """Content hash of a file, the name of its snapshot directory."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        while chunk := file.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot_path(
+    root: Path,
+    file_hash: str,
+    max_nodes: Optional[int] = None,
+    strategy: Optional[str] = None,
+    seed: Optional[int] = None,
+) -> Path:
+    """Snapshot directory of a dataset's full network, or of one of its samples."""
+    path = Path(root) / file_hash
+    if max_nodes is None:
+        return path
+    slug = str(strategy).lower().replace(" ", "-")
+    return path / "samples" / f"{slug}-{max_nodes}-{seed}"
+
+
+def partition_key(top_neighbours_nodes: int, algorithm: str, params: Dict[str, Any]) -> str:
+    """Key a partition is saved under for the graph view settings it was detected with."""
+    return repr((top_neighbours_nodes, algorithm, sorted(params.items())))
+
+
+def has_snapshot(path: Path) -> bool:
+    manifest = _read_manifest(Path(path))
+    return manifest is not None and manifest["format_version"] == SNAPSHOT_FORMAT_VERSION
+
+
+def saved_rows_count(path: Path) -> Optional[int]:
+    """Rows count of the source of the snapshot at `path`, without opening the network."""
+    if not has_snapshot(path):
+        return None
+    return _read_manifest(Path(path))["rows_count"]
+
+
+def save_network(network: "UserNetwork", path: Path):
+    """Write the users and aggregated edges of `network` to the snapshot at `path`."""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    edges = network.edge_table(usernames=False)
+
+    _write_table(path / _USERS, pa.table({"name": pa.array(network.users.names, pa.string())}))
+    _write_table(
+        path / _EDGES,
+        pa.table(
+            {
+                "source": pa.array(edges["source"].to_numpy(), pa.int64()),
+                "target": pa.array(edges["target"].to_numpy(), pa.int64()),
+                "weight": pa.array(edges["weight"].to_numpy(), pa.int64()),
+                "interaction_types": _arrow_column(
+                    edges["interaction_types"],
+                    _INTERACTION_TYPES,
+                    lambda counts: list(counts.items()),
+                ),
+                "first_timestamp": pa.array(edges["first_timestamp"], pa.timestamp("ns")),
+                "last_timestamp": pa.array(edges["last_timestamp"], pa.timestamp("ns")),
+                "tweets": _arrow_column(edges["tweets"], pa.list_(pa.int64()), list),
+            }
+        ),
+    )
+    _write_bytes(
+        path / _MANIFEST,
+        json.dumps(
+            {
+                "format_version": SNAPSHOT_FORMAT_VERSION,
+                "users": network.number_of_users(),
+                "edges": network.number_of_edges(),
+                "rows_count": network.rows_count,
+            }
+        ).encode(),
+    )
+
+
+def load_network(path: Path) -> "UserNetwork":
+    """
+    Open the network of the snapshot at `path`.
+
+    The "interaction_types" and "tweets" edge columns stay in the memory-mapped
+    Arrow buffers (as `pd.ArrowDtype` columns) instead of becoming Python objects.
+    """
+    from src.app.model import UserNetwork
+
+    path = Path(path)
+    manifest = _read_manifest(path)
+    users = _read_table(path / _USERS)
+    edges = _read_table(path / _EDGES)
+    _touch(path / _MANIFEST)
+
+    edge_frame = pd.DataFrame(
+        {
+            "source": edges["source"].to_numpy(),
+            "target": edges["target"].to_numpy(),
+            "weight": edges["weight"].to_numpy(),
+            "interaction_types": edges["interaction_types"].to_pandas(
+                types_mapper=pd.ArrowDtype
+            ),
+            "first_timestamp": edges["first_timestamp"].to_numpy(),
+            "last_timestamp": edges["last_timestamp"].to_numpy(),
+            "tweets": edges["tweets"].to_pandas(types_mapper=pd.ArrowDtype),
+        }
+    )
+    network = UserNetwork.from_edge_table(
+        users["name"].to_numpy(zero_copy_only=False), edge_frame
+    )
+    network.rows_count = manifest["rows_count"]
+    return network
+
+
+def evict_snapshots(
+    root: Path,
+    max_bytes: int = DEFAULT_SNAPSHOT_MAX_BYTES,
+    keep: Sequence[Path] = (),
+) -> int:
+    """
+    Remove the snapshots of the least recently used datasets under `root` until
+    the rest takes at most `max_bytes`. The datasets of the snapshots in `keep`
+    (e.g. the ones just written) are never removed. Returns the number of bytes
+    freed.
+
+    Not safe to run while another process writes snapshots under `root`: it may
+    remove a dataset that is being written.
+    """
+    root = Path(root)
+    if not root.is_dir():
+        return 0
+
+    kept = [Path(path).resolve() for path in keep]
+    datasets = []
+    for directory in root.iterdir():
+        if directory.is_dir():
+            files = [file for file in directory.rglob("*") if file.is_file()]
+            last_used = max(
+                (file.stat().st_mtime for file in files if file.name == _MANIFEST),
+                default=0.0,
+            )
+            size = sum(file.stat().st_size for file in files)
+            datasets.append((last_used, size, directory))
+
+    total = sum(size for _, size, _ in datasets)
+    freed = 0
+    for _, size, directory in sorted(datasets):
+        if total - freed <= max_bytes:
+            break
+        if any(path.is_relative_to(directory.resolve()) for path in kept):
+            continue
+        shutil.rmtree(directory, ignore_errors=True)
+        freed += size
+    return freed
+
+
+def save_metrics(
+    network: "UserNetwork", path: Path, options: Optional["CentralityOptions"] = None
+):
+    """
+    Write every metric array `network` has computed for `options` (by default
+    its own centrality options).
+    """
+    options = options or network.centrality_options
+    directory = _metrics_directory(Path(path), options)
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, values in network.computed_metric_values(options).items():
+        target = directory / f"{name}.npy"
+        if not target.exists():
+            _write_with(target, lambda file, values=values: np.save(file, values.values))
+
+
+def load_metrics(
+    network: "UserNetwork", path: Path, options: Optional["CentralityOptions"] = None
+) -> int:
+    """
+    Provide `network` with the metric arrays stored for `options` (by default its
+    own centrality options). The arrays stay memory-mapped. Returns the number of
+    metrics loaded.
+    """
+    options = options or network.centrality_options
+    directory = _metrics_directory(Path(path), options)
+    if not directory.is_dir():
+        return 0
+
+    available = network.computed_metric_values(options)
+    loaded = 0
+    for file in directory.glob("*.npy"):
+        if file.stem not in available:
+            network.set_metric_values(
+                file.stem, np.load(file, mmap_mode="r"), options
+            )
+            loaded += 1
+    return loaded
+
+
+def save_partition(path: Path, key: str, result: "CommunityResult"):
+    directory = Path(path) / _PARTITIONS
+    directory.mkdir(parents=True, exist_ok=True)
+    table = pa.table(
+        {
+            "node": pa.array(list(result.partition.keys()), pa.int64()),
+            "community": pa.array(list(result.partition.values()), pa.int64()),
+        }
+    ).replace_schema_metadata(
+        {
+            "engine": result.engine,
+            "modularity": repr(result.modularity),
+            "runtime": repr(result.runtime),
+        }
+    )
+    _write_table(directory / f"{_partition_file_stem(key)}.arrow", table)
+
+
+def load_partition(path: Path, key: str) -> Optional["CommunityResult"]:
+    """The partition stored under `key`, or None when there is none."""
+    from src.app.utils.community_engines import CommunityResult
+
+    file = Path(path) / _PARTITIONS / f"{_partition_file_stem(key)}.arrow"
+    if not file.exists():
+        return None
+
+    table = _read_table(file)
+    metadata = {name.decode(): value.decode() for name, value in table.schema.metadata.items()}
+    nodes = table["node"].to_numpy().tolist()
+    return CommunityResult(
+        partition=dict(zip(nodes, table["community"].to_numpy().tolist())),
+        modularity=float(metadata["modularity"]),
+        runtime=float(metadata["runtime"]),
+        engine=metadata["engine"],
+    )
+
+
+def _metrics_directory(path: Path, options: "CentralityOptions") -> Path:
+    if not options.approximate:
+        return path / _METRICS / "exact"
+    return path / _METRICS / f"approximate-{options.samples}-{options.seed}"
+
+
+def _arrow_column(values: pd.Series, type: pa.DataType, convert) -> pa.Array:
+    return pa.array([convert(value) for value in values], type)
+
+
+def _touch(file: Path):
+    # Marks the dataset as used for `evict_snapshots`.
+    try:
+        os.utime(file)
+    except OSError:
+        pass
+
+
+def _partition_file_stem(key: str) -> str:
+    return hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+
+
+def _read_manifest(path: Path) -> Optional[Dict]:
+    try:
+        return json.loads((path / _MANIFEST).read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _read_table(file: Path) -> pa.Table:
+    with pa.memory_map(str(file)) as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def _write_table(file: Path, table: pa.Table):
+    def write(sink):
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    _write_with(file, write)
+
+
+def _write_bytes(file: Path, data: bytes):
+    _write_with(file, lambda sink: sink.write(data))
+
+
+def _write_with(file: Path, write):
+    descriptor, temporary = tempfile.mkstemp(dir=file.parent, prefix=f".{file.name}.")
+    try:
+        with os.fdopen(descriptor, "wb") as sink:
+            write(sink)
+        os.replace(temporary, file)
+    except BaseException:
+        os.unlink(temporary)
+        raise
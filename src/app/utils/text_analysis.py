@@ -0,0 +1,44 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from src.app.utils.text_entities import EntityMatches, TextEntities
+
+WORD_CLOUD_WIDTH = 800
+WORD_CLOUD_HEIGHT = 400
+
+
+def get_prefixed_tokens(entities: TextEntities, prefix: str) -> EntityMatches:
+    if prefix == "#":
+        return entities.hashtags
+    if prefix == "@":
+        return entities.mentions
+    raise ValueError(f"Unsupported token prefix: {prefix!r}, expected '#' or '@'")
+
+
+def token_frequencies(entities: TextEntities, prefix: str = "#") -> pd.Series:
+    """
+    Case-insensitive frequency of every hashtag ("#") or mention ("@"), most common first.
+
+    Tokens are keyed with their prefix, e.g. "#fail".
+    """
+    matches = get_prefixed_tokens(entities, prefix)
+    counts = np.bincount(matches.ids, minlength=len(matches.vocabulary))
+    keys = pd.Index(matches.vocabulary, dtype=object).str.lower()
+    frequencies = pd.Series(counts, index=prefix + keys).groupby(level=0, sort=False).sum()
+
+    return frequencies.sort_values(ascending=False, kind="stable")
+
+
+def render_word_cloud(frequencies: pd.Series) -> bytes:
+    """PNG image of a word cloud sized by `frequencies`."""
+    # wordcloud loads matplotlib; import it only when a cloud is drawn.
+    from wordcloud import WordCloud
+
+    wordcloud = WordCloud(width=WORD_CLOUD_WIDTH, height=WORD_CLOUD_HEIGHT)
+    wordcloud.generate_from_frequencies(frequencies.to_dict())
+
+    buffer = io.BytesIO()
+    wordcloud.to_image().save(buffer, format="PNG")
+    return buffer.getvalue()
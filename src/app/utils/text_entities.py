@@ -0,0 +1,96 @@
+"""
+Single-pass extraction of mentions, hashtags and URLs from tweet text.
+
+A whole text column is scanned once with one precompiled pattern. Matches come
+back as flat arrays (row position + id into an interned vocabulary per entity
+kind) that the network builder and the text analysis share.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, List
+
+import numpy as np
+import pandas as pd
+
+# URLs come first so a "#" fragment inside a link is not taken for a hashtag. URLs
+# stop at any character that is not a word or URL punctuation character, and at
+# "@", so a mention glued to a link (e.g. after a closing quote) is still found.
+ENTITY_PATTERN = re.compile(
+    r"(?P<url>https?://[\w\-.~:/?#\[\]!$&'()*+,;=%]+)|@(?P<mention>\w+)|#(?P<hashtag>\w+)"
+)
+_URL, _MENTION, _HASHTAG = 1, 2, 3
+
+
+@dataclass(frozen=True)
+class EntityMatches:
+    """Matches of one entity kind: `rows[i]` is the text position of `vocabulary[ids[i]]`."""
+
+    rows: np.ndarray
+    ids: np.ndarray
+    vocabulary: np.ndarray
+
+    def __len__(self):
+        return len(self.rows)
+
+    def values(self) -> np.ndarray:
+        return self.vocabulary[self.ids]
+
+    def counts(self) -> pd.Series:
+        """Number of occurrences per vocabulary entry, most frequent first."""
+        counts = np.bincount(self.ids, minlength=len(self.vocabulary))
+        return pd.Series(counts, index=self.vocabulary).sort_values(
+            ascending=False, kind="stable"
+        )
+
+
+@dataclass(frozen=True)
+class TextEntities:
+    mentions: EntityMatches
+    hashtags: EntityMatches
+    urls: EntityMatches
+
+
+def find_mentions(text: str) -> List[str]:
+    """Mentioned usernames of a single text, in order of appearance."""
+    return [
+        match.group(_MENTION)
+        for match in ENTITY_PATTERN.finditer(text)
+        if match.lastindex == _MENTION
+    ]
+
+
+def extract_entities(texts: Iterable) -> TextEntities:
+    """
+    Scan every text once and collect its mentions, hashtags and URLs.
+
+    Rows are positions in `texts` (not index labels); missing values are skipped.
+    """
+    rows = ([], [], [], [])
+    values = ([], [], [], [])
+    finditer = ENTITY_PATTERN.finditer
+    if isinstance(texts, pd.Series):
+        texts = texts.tolist()
+
+    for position, text in enumerate(texts):
+        if not isinstance(text, str):
+            continue
+        for match in finditer(text):
+            kind = match.lastindex
+            rows[kind].append(position)
+            values[kind].append(match.group(kind))
+
+    return TextEntities(
+        mentions=_intern(rows[_MENTION], values[_MENTION]),
+        hashtags=_intern(rows[_HASHTAG], values[_HASHTAG]),
+        urls=_intern(rows[_URL], values[_URL]),
+    )
+
+
+def _intern(rows: List[int], values: List[str]) -> EntityMatches:
+    ids, vocabulary = pd.factorize(np.asarray(values, dtype=object))
+    return EntityMatches(
+        rows=np.asarray(rows, dtype=np.int64),
+        ids=ids.astype(np.int64, copy=False),
+        vocabulary=np.asarray(vocabulary, dtype=object),
+    )
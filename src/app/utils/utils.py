@@ -1,55 +1,65 @@
-from typing import Iterable
+import io
+from typing import BinaryIO, Callable, Optional, Tuple
 
 import pandas as pd
 
 import src.app.utils.df_parser as df_parser
-from src.app.model import Interaction, Tweet, User, UserNetwork
-
-
-def iterate_interactions(tweets: Iterable[Tweet]) -> Iterable[Interaction]:
-    for tweet in tweets:
-        for username in tweet.find_mentioned_users():
-            yield Interaction(User(tweet.username), User(username))
-
-
-def create_user_network(df: pd.DataFrame) -> UserNetwork:
-    if is_dataframe_with_content(df):
-        return _create_user_network_by_content(df)
-
-    return _create_user_network_by_cols(df)
-
-
-def _create_user_network_by_content(df: pd.DataFrame) -> UserNetwork:
-    users = df_parser.get_users(df).values()
-    tweets = df_parser.iterate_tweets(df)
-    interactions = iterate_interactions(tweets)
-
-    return UserNetwork(list(users), list(interactions))
-
-
-def _create_user_network_by_cols(df: pd.DataFrame) -> UserNetwork:
-    social_interactions = df_parser.parse_dataframe(df)
-
-    users = set()
-    interactions = set()
-
-    for social_interaction in social_interactions:
-        user_from = User(
-            name=social_interaction.who_username or social_interaction.who_id
-        )
-        user_to = User(
-            name=social_interaction.to_whom_username or social_interaction.to_whom_id
-        )
-
-        users.add(user_from)
-        users.add(user_to)
-
-        interaction = Interaction(user1=user_from, user2=user_to)
-        interactions.add(interaction)
-
-    return UserNetwork(list(users), list(interactions))
-
-
-def is_dataframe_with_content(df: pd.DataFrame) -> bool:
-    cols = df.columns
-    return ("text" in cols or "content" in cols) and "name" in cols
+from src.app.model import UserNetwork
+from src.app.utils.constants import DEFAULT_CHUNK_SIZE
+from src.app.utils.df_parser import is_dataframe_with_content
+from src.app.utils.profiling import profiled
+from src.app.utils.text_entities import TextEntities
+
+_CHUNK_DTYPES = {"interaction_type": "category"}
+
+
+@profiled("create_user_network")
+def create_user_network(
+    df: pd.DataFrame, entities: Optional[TextEntities] = None
+) -> UserNetwork:
+    """
+    Build the network of a whole DataFrame. `entities` can pass in the result of
+    `extract_entities` on its text column when it was already computed.
+    """
+    user_network = UserNetwork([])
+    user_network.add_interactions(df, reindex=False, entities=entities)
+
+    return user_network
+
+
+@profiled("create_user_network")
+def create_user_network_from_csv(
+    file: BinaryIO,
+    chunksize: int = DEFAULT_CHUNK_SIZE,
+    on_progress: Optional[Callable[[int, float], None]] = None,
+) -> Tuple[UserNetwork, int]:
+    """
+    Build a network by streaming a CSV in chunks instead of loading it whole.
+
+    Only the columns needed for the network are read, with compact dtypes, and each
+    chunk's edges are folded into the graph before the next chunk is read.
+    `on_progress` is called after every chunk with the rows read so far and the
+    fraction of the file consumed. Returns the network and the number of rows.
+    """
+    header = pd.read_csv(file, nrows=0)
+    with_content = is_dataframe_with_content(header)
+    usecols = df_parser.get_network_columns(header.columns, with_content)
+    file.seek(0, io.SEEK_END)
+    total_bytes = file.tell() or 1
+    file.seek(0)
+
+    user_network = UserNetwork([])
+    rows = 0
+    chunks = pd.read_csv(
+        file,
+        usecols=usecols,
+        dtype={col: _CHUNK_DTYPES.get(col, "string") for col in usecols},
+        chunksize=chunksize,
+    )
+    for chunk in chunks:
+        user_network.add_interactions(chunk, reindex=False)
+        rows += len(chunk)
+        if on_progress is not None:
+            on_progress(rows, min(file.tell() / total_bytes, 1.0))
+
+    return user_network, rows
@@ -0,0 +1,53 @@
+import os
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_interactions
+from src.app.batch import BatchSettings, analyze_files
+from src.app.utils import snapshot
+
+
+@pytest.fixture
+def sources(tmp_path):
+    paths = []
+    for seed in (1, 2):
+        path = tmp_path / f"export-{seed}.csv"
+        generate_interactions(500, n_users=100, seed=seed).to_csv(path, index=False)
+        paths.append(str(path))
+    return paths
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_snapshots_are_evicted_once_after_every_file(
+    sources, tmp_path, monkeypatch, jobs
+):
+    calls = tmp_path / "evictions"
+
+    def record_eviction(root, max_bytes=None, keep=()):
+        with open(calls, "a") as file:
+            file.write(f"{os.getpid()} {sorted(str(path) for path in keep)}\n")
+        return 0
+
+    monkeypatch.setattr(snapshot, "evict_snapshots", record_eviction)
+    results = analyze_files(
+        sources, BatchSettings(max_nodes=30), tmp_path / "snapshots", jobs=jobs
+    )
+
+    kept = sorted(
+        str(snapshot.snapshot_path(tmp_path / "snapshots", result.file_hash))
+        for result in results
+    )
+    assert calls.read_text().splitlines() == [f"{os.getpid()} {kept}"]
+
+
+def test_export_covers_the_users_of_the_sample(sources, tmp_path):
+    (result,) = analyze_files(
+        sources[:1],
+        BatchSettings(max_nodes=30),
+        tmp_path / "snapshots",
+        export_dir=tmp_path / "export",
+    )
+
+    metrics = pd.read_parquet(tmp_path / "export" / "export-1" / "metrics.parquet")
+    assert result.users > result.sampled_users == len(metrics)
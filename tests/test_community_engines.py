@@ -0,0 +1,65 @@
+import itertools
+import threading
+from concurrent.futures import CancelledError
+
+import networkx as nx
+import pytest
+from networkx.algorithms.community import girvan_newman
+
+from src.app.utils.community_engines import (
+    available_engines,
+    detect_girvan_newman,
+    run_engine,
+)
+
+
+@pytest.fixture
+def graph():
+    return nx.Graph(nx.karate_club_graph().edges())
+
+
+@pytest.mark.parametrize("max_communities", [2, 3, 5])
+def test_girvan_newman_returns_the_level_with_max_communities(graph, max_communities):
+    level = next(
+        itertools.islice(girvan_newman(graph), max_communities - 2, None)
+    )
+    expected = {node: idx for idx, community in enumerate(level) for node in community}
+
+    assert detect_girvan_newman(graph, max_communities) == expected
+
+
+def test_girvan_newman_out_of_time_returns_connected_components():
+    graph = nx.disjoint_union(nx.path_graph(4), nx.path_graph(3))
+
+    partition = detect_girvan_newman(graph, max_communities=5, time_limit=0)
+
+    assert partition == {0: 0, 1: 0, 2: 0, 3: 0, 4: 1, 5: 1, 6: 1}
+
+
+@pytest.mark.parametrize("engine", available_engines())
+def test_engines_are_deterministic(graph, engine):
+    first = run_engine(graph, engine)
+    second = run_engine(graph, engine)
+
+    assert first.partition == second.partition
+    assert set(first.partition) == set(graph)
+    assert first.modularity == pytest.approx(second.modularity)
+    assert first.engine == engine
+
+
+@pytest.mark.parametrize("engine", ["Time-limited Louvain", "Girvan Newman"])
+def test_cancelled_engines_stop(graph, engine):
+    cancelled = threading.Event()
+    cancelled.set()
+
+    with pytest.raises(CancelledError):
+        run_engine(graph, engine, cancelled=cancelled)
+
+
+def test_girvan_newman_stops_when_cancelled_during_a_pass():
+    graph = nx.barabasi_albert_graph(300, 3, seed=1)
+    cancelled = threading.Event()
+    threading.Timer(0.05, cancelled.set).start()
+
+    with pytest.raises(CancelledError):
+        detect_girvan_newman(graph, max_communities=50, cancelled=cancelled)
@@ -0,0 +1,74 @@
+import io
+
+import pandas as pd
+
+from src.app.utils import df_parser
+from src.app.utils.df_parser import aggregate_edges, get_interaction_edges
+from src.app.utils.text_entities import extract_entities
+from src.app.utils.utils import create_user_network, create_user_network_from_csv
+
+
+def test_aggregate_edges_merges_repeated_and_reversed_interactions():
+    df = pd.DataFrame(
+        {
+            "who": ["a", "b", "a", "c"],
+            "to_whom": ["b", "a", "b", "a"],
+            "interaction_type": ["reply", "retweet", "reply", "mention"],
+        }
+    )
+
+    edges = aggregate_edges(get_interaction_edges(df)).set_index(["source", "target"])
+
+    assert edges.loc[("a", "b"), "weight"] == 3
+    assert edges.loc[("a", "b"), "interaction_types"] == {"reply": 2, "retweet": 1}
+    assert sorted(edges.loc[("a", "b"), "tweets"]) == [0, 1, 2]
+    assert edges.loc[("a", "c"), "weight"] == 1
+    assert len(edges) == 2
+
+
+def test_aggregate_edges_without_edges():
+    df = pd.DataFrame({"who": [], "to_whom": [], "interaction_type": []})
+
+    edges = aggregate_edges(get_interaction_edges(df))
+
+    assert edges.empty
+    assert {"source", "target", "weight", "tweets", "interaction_types"} <= set(edges)
+
+
+def test_network_of_tweets_without_mentions_keeps_authors():
+    df = pd.DataFrame({"name": ["a", "b", "c"], "text": ["hello", "world", "none"]})
+
+    network = create_user_network(df)
+
+    assert network.number_of_users() == 3
+    assert network.number_of_edges() == 0
+    assert network.graph.number_of_nodes() == 3
+
+
+def test_network_built_from_extracted_entities_does_not_scan_texts_again(monkeypatch):
+    df = pd.DataFrame(
+        {"name": ["a", "b", "c"], "text": ["@b hi #x", None, "@a @b https://x.y"]},
+        index=[10, 11, 12],
+    )
+    entities = extract_entities(df["text"])
+    expected = create_user_network(df)
+
+    def fail(texts):
+        raise AssertionError("texts scanned again")
+
+    monkeypatch.setattr(df_parser, "extract_entities", fail)
+    network = create_user_network(df, entities)
+
+    assert network.users.names == expected.users.names
+    assert network.edge_table().equals(expected.edge_table())
+
+
+def test_chunked_reader_skips_chunks_without_mentions():
+    df = pd.DataFrame({"name": ["a", "b", "c", "d"], "text": ["hi", "there", "@a yo", "z"]})
+    file = io.BytesIO(df.to_csv(index=False).encode())
+
+    network, rows_count = create_user_network_from_csv(file, chunksize=2)
+
+    assert rows_count == 4
+    assert network.number_of_users() == 4
+    assert network.number_of_edges() == 1
@@ -0,0 +1,24 @@
+from benchmarks.import_time import (
+    APP_MODULE,
+    DEFAULT_BUDGET_SECONDS,
+    DEFERRED_MODULES,
+    measure_import,
+)
+
+# Generous against DEFAULT_BUDGET_SECONDS, so that slow or busy CI hosts still pass;
+# `python -m benchmarks.import_time` checks the actual budget.
+TEST_BUDGET_SECONDS = 3 * DEFAULT_BUDGET_SECONDS
+
+
+def test_app_import_does_not_load_deferred_modules():
+    modules = measure_import()["modules"]
+
+    assert APP_MODULE in modules
+    assert [module for module in DEFERRED_MODULES if module in modules] == []
+
+
+def test_app_import_fits_the_time_budget():
+    # Best of two cold imports, so that one disk cache miss does not fail the test.
+    seconds = min(measure_import()["seconds"] for _ in range(2))
+
+    assert seconds < TEST_BUDGET_SECONDS
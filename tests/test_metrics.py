@@ -0,0 +1,141 @@
+import os
+import threading
+
+import networkx as nx
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_interactions
+from src.app.utils import metrics, parallel
+from src.app.utils.constants import MetricsBackend
+from src.app.utils.metrics import CentralityOptions, GraphStats
+from src.app.utils.sparse_metrics import (
+    SPARSE_METRICS,
+    as_node_dict,
+    clustering,
+    pagerank,
+    triangles,
+)
+from src.app.utils.utils import create_user_network
+
+
+def test_graph_stats_computes_a_metric_once_for_concurrent_callers(monkeypatch):
+    calls = []
+    started = threading.Event()
+
+    def slow_pagerank(graph):
+        calls.append(1)
+        started.set()
+        threading.Event().wait(0.1)
+        return nx.pagerank(graph)
+
+    monkeypatch.setitem(metrics.GRAPH_METRICS, "pagerank", slow_pagerank)
+    stats = GraphStats(nx.karate_club_graph(), version=0)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(stats["pagerank"]))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+@pytest.fixture(scope="module")
+def graph():
+    graph = nx.barabasi_albert_graph(parallel.PARALLEL_MIN_NODES, 2, seed=1)
+    graph.add_edges_from([(0, 0), ("a", "b")])
+    return nx.relabel_nodes(graph, {node: f"user{node}" for node in range(0, 20, 3)})
+
+
+@pytest.fixture
+def two_cpus(monkeypatch):
+    # Workers are capped by the CPUs available; the pool must run on any host.
+    monkeypatch.setattr(parallel, "available_cpus", lambda: 2)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_centrality_equals_networkx_exactly(graph, workers, two_cpus):
+    assert metrics.betweenness_centrality(graph, workers) == (
+        nx.betweenness_centrality(graph)
+    )
+    assert metrics.closeness_centrality(graph, workers) == (
+        nx.closeness_centrality(graph)
+    )
+    assert metrics.approximate_betweenness_centrality(graph, 20, 7, workers) == (
+        nx.betweenness_centrality(graph, k=20, seed=7)
+    )
+
+
+def test_parallel_approximate_closeness_equals_serial_exactly(graph, two_cpus):
+    assert metrics.approximate_closeness_centrality(graph, 20, 7, workers=2) == (
+        metrics.approximate_closeness_centrality(graph, 20, 7, workers=1)
+    )
+
+
+def test_workers_run_chunks_in_other_processes(graph, two_cpus):
+    adjacency = parallel.adjacency_lists(graph)
+    chunks = parallel.chunk_plan(range(len(graph)))
+
+    pids = set(parallel.map_chunks(_process_id, adjacency, chunks, workers=2))
+
+    assert pids and os.getpid() not in pids
+
+
+def test_workers_are_not_used_with_a_single_cpu(graph, monkeypatch):
+    monkeypatch.setattr(parallel, "available_cpus", lambda: 1)
+    adjacency = parallel.adjacency_lists(graph)
+    chunks = parallel.chunk_plan(range(len(graph)))
+
+    pids = set(parallel.map_chunks(_process_id, adjacency, chunks, workers=2))
+
+    assert pids == {os.getpid()}
+
+
+def _process_id(adjacency, chunk) -> int:
+    return os.getpid()
+
+
+@pytest.fixture(scope="module")
+def network():
+    network = create_user_network(generate_interactions(3000, n_users=300, seed=3))
+    network.add_edges([], [(network.get_username(0), network.get_username(0), _edge())])
+    return network
+
+
+def test_sparse_metrics_equal_networkx(network):
+    adjacency = network.adjacency
+
+    assert as_node_dict(triangles(adjacency)) == nx.triangles(network.graph)
+    assert as_node_dict(clustering(adjacency)) == nx.clustering(network.graph)
+    assert as_node_dict(pagerank(adjacency)) == pytest.approx(
+        nx.pagerank(network.graph), abs=1e-6
+    )
+
+
+@pytest.mark.parametrize("name", list(SPARSE_METRICS))
+def test_graph_stats_backends_give_the_same_values(network, name):
+    stats = GraphStats(network.graph, version=0, adjacency=network.adjacency)
+    sparse = stats.compute(
+        name, CentralityOptions(backend=MetricsBackend.SPARSE.value)
+    )
+    stats = GraphStats(network.graph, version=0, adjacency=network.adjacency)
+    nx_values = stats.compute(
+        name, CentralityOptions(backend=MetricsBackend.NETWORKX.value)
+    )
+
+    assert sparse == pytest.approx(nx_values, abs=1e-6)
+
+
+def _edge() -> dict:
+    return {
+        "weight": 2,
+        "interaction_types": {"reply": 2},
+        "first_timestamp": pd.Timestamp("2024-02-01"),
+        "last_timestamp": pd.Timestamp("2024-02-01"),
+        "tweets": [1, 2],
+    }
@@ -0,0 +1,98 @@
+import networkx as nx
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_interactions, generate_tweets
+from src.app.model import Interaction, Tweet, User, UserNetwork
+from src.app.utils import community_engines
+from src.app.utils.utils import create_user_network
+
+
+def _edges_by_name(network: UserNetwork) -> pd.DataFrame:
+    edges = network.edge_table()
+    # Each pair is stored once, with either user first depending on interning order.
+    swap = edges["source"] > edges["target"]
+    edges["source"], edges["target"] = (
+        edges["source"].where(~swap, edges["target"]),
+        edges["target"].where(~swap, edges["source"]),
+    )
+    edges["tweets"] = [sorted(tweets) for tweets in edges["tweets"]]
+    return edges.sort_values(["source", "target"]).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("generate", [generate_interactions, generate_tweets])
+def test_appended_batches_give_the_network_of_a_full_build(generate):
+    df = generate(3000, seed=5)
+    expected = create_user_network(df)
+
+    network = UserNetwork([])
+    for start in range(0, len(df), 700):
+        network.add_interactions(df.iloc[start : start + 700])
+
+    assert network.rows_count == expected.rows_count == len(df)
+    assert sorted(network.users.names) == sorted(expected.users.names)
+    pd.testing.assert_frame_equal(_edges_by_name(network), _edges_by_name(expected))
+    degrees = dict(zip(network.users.names, network.degrees()))
+    assert degrees == dict(zip(expected.users.names, expected.degrees()))
+
+
+def test_warm_start_starts_from_the_previous_partition(monkeypatch):
+    df = generate_interactions(2000, n_users=300, seed=2)
+    network = create_user_network(df.iloc[:1500])
+    starts = []
+
+    def spy(graph, method, **kwargs):
+        starts.append(kwargs.get("partition"))
+        return run_engine(graph, method, **kwargs)
+
+    run_engine = community_engines.run_engine
+    monkeypatch.setattr(community_engines, "run_engine", spy)
+    previous = network.run_community_detection(network.graph, "Louvain").partition
+    network.add_interactions(df.iloc[1500:])
+    network.run_community_detection(network.graph, "Louvain", warm_start=True)
+
+    cold, warm = starts
+    assert cold is None
+    assert set(warm) == set(network.graph)
+    assert {node: warm[node] for node in previous} == previous
+    new_ids = [warm[node] for node in set(warm) - set(previous)]
+    assert new_ids
+    assert len(set(new_ids)) == len(new_ids)
+    assert min(new_ids) > max(previous.values())
+
+
+def test_warm_start_partition_puts_new_nodes_in_singletons():
+    graph = nx.path_graph(5)
+
+    partition = UserNetwork.warm_start_partition({0: 0, 1: 0, 2: 1}, graph)
+
+    assert partition == {0: 0, 1: 0, 2: 1, 3: 2, 4: 3}
+
+
+@pytest.mark.parametrize("k", [0, 1, 7, 50, 151, 152, 500])
+def test_top_degree_users_match_a_full_sort(k):
+    network = create_user_network(generate_interactions(400, n_users=200, seed=3))
+    degrees = network.degrees()
+    n = len(degrees)
+    assert n == 152
+    # A sparse network: many users share a degree, so the cut falls inside ties.
+    assert len(set(degrees.tolist())) < n
+
+    expected = sorted(range(n), key=lambda user: (-degrees[user], user))[:k]
+
+    assert network.top_degree_users(k).tolist() == expected
+
+
+def test_interactions_keep_their_tweet_and_put_their_row_on_the_edge():
+    tweet = Tweet("hi @b", "a")
+    interactions = [
+        Interaction(User("a"), User("b"), tweet),
+        Interaction(User("b"), User("a"), interaction_type="reply", row=4),
+    ]
+
+    network = UserNetwork([], interactions)
+
+    assert interactions[0].tweet is tweet
+    edges = network.edge_table()
+    assert edges["weight"].tolist() == [2]
+    assert edges["tweets"].tolist() == [[4]]
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.app.presenter.presenter import NetworkPresenter
+from src.app.utils.constants import NodeSizeScale
+from src.app.utils.utils import create_user_network
+
+MIN_SIZE, MAX_SIZE = 5, 20
+MIDDLE_SIZE = (MIN_SIZE + MAX_SIZE) / 2
+
+
+def _presenter(df: pd.DataFrame) -> NetworkPresenter:
+    return NetworkPresenter(
+        create_user_network(df), min_node_size=MIN_SIZE, max_node_size=MAX_SIZE
+    )
+
+
+def _degree_sizes(presenter: NetworkPresenter, scale: NodeSizeScale) -> np.ndarray:
+    nodes = range(presenter.user_network.number_of_users())
+    sizes = presenter.metric_node_sizes(nodes, "degree", scale)
+    return np.array([sizes[node] for node in nodes])
+
+
+@pytest.fixture
+def star_with_isolated_users():
+    # "hub" mentions three users; "x" and "y" only tweet, so their degree is 0.
+    return _presenter(
+        pd.DataFrame(
+            {
+                "name": ["hub", "hub", "hub", "x", "y"],
+                "text": ["@a", "@b hi", "@c", "no mentions", "none either"],
+            }
+        )
+    )
+
+
+@pytest.mark.parametrize("scale", list(NodeSizeScale))
+def test_equal_values_get_the_middle_size(scale):
+    presenter = _presenter(
+        pd.DataFrame(
+            {
+                "who": ["a", "b", "c"],
+                "to_whom": ["b", "c", "a"],
+                "interaction_type": ["reply"] * 3,
+            }
+        )
+    )
+
+    assert _degree_sizes(presenter, scale).tolist() == [MIDDLE_SIZE] * 3
+
+
+@pytest.mark.parametrize("scale", list(NodeSizeScale))
+def test_a_single_node_gets_the_middle_size(scale):
+    presenter = _presenter(pd.DataFrame({"name": ["solo"], "text": ["hello"]}))
+
+    assert _degree_sizes(presenter, scale).tolist() == [MIDDLE_SIZE]
+
+
+@pytest.mark.parametrize("scale", [NodeSizeScale.LINEAR, NodeSizeScale.LOG])
+def test_sizes_span_the_range_in_value_order(star_with_isolated_users, scale):
+    presenter = star_with_isolated_users
+    degrees = presenter.user_network.degrees()
+
+    sizes = _degree_sizes(presenter, scale)
+
+    assert np.isfinite(sizes).all()
+    assert sizes[degrees == 0].tolist() == [MIN_SIZE] * 2
+    assert sizes[degrees.argmax()] == MAX_SIZE
+    order = np.argsort(degrees, kind="stable")
+    assert (np.diff(sizes[order]) >= 0).all()
+
+
+def test_log_scale_keeps_zero_values_finite_and_compresses_the_hub(
+    star_with_isolated_users,
+):
+    presenter = star_with_isolated_users
+    degrees = presenter.user_network.degrees()
+
+    linear = _degree_sizes(presenter, NodeSizeScale.LINEAR)
+    log = _degree_sizes(presenter, NodeSizeScale.LOG)
+
+    leaves = degrees == 1
+    expected = MIN_SIZE + np.log1p(1) / np.log1p(3) * (MAX_SIZE - MIN_SIZE)
+    assert log[leaves] == pytest.approx(expected)
+    assert (log[leaves] > linear[leaves]).all()
+
+
+def test_quantile_scale_gives_tied_values_their_middle_rank(star_with_isolated_users):
+    presenter = star_with_isolated_users
+    degrees = presenter.user_network.degrees()
+
+    sizes = _degree_sizes(presenter, NodeSizeScale.QUANTILE)
+
+    # Six users: the two zeros share ranks 0-1 and the three leaves ranks 2-4.
+    step = (MAX_SIZE - MIN_SIZE) / 5
+    assert sizes[degrees == 0].tolist() == [MIN_SIZE + 0.5 * step] * 2
+    assert sizes[degrees == 1].tolist() == [MIN_SIZE + 3 * step] * 3
+    assert sizes[degrees.argmax()] == MAX_SIZE
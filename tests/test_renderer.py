@@ -0,0 +1,27 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks.synthetic import generate_interactions
+from src.app.presenter import renderer
+from src.app.utils.utils import create_user_network
+
+
+def test_layouts_are_cached_per_partition_across_threads():
+    network = create_user_network(generate_interactions(300, n_users=80, seed=1))
+    graph = network.graph
+    partitions = [
+        {node: node % communities for node in graph} for communities in range(1, 25)
+    ]
+
+    def layout(partition):
+        return renderer.get_layout(network, graph, partition)
+
+    with ThreadPoolExecutor(8) as executor:
+        layouts = list(executor.map(layout, partitions * 3))
+
+    cache = renderer._layout_cache[network]
+    assert len(cache) == renderer.MAX_CACHED_LAYOUTS
+    for (nodes, positions), partition in zip(layouts, partitions * 3):
+        assert nodes == list(graph)
+        np.testing.assert_array_equal(positions, layout(partition)[1])
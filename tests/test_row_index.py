@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_tweets
+from src.app.utils.row_index import UserRowIndex
+
+
+@pytest.fixture
+def df():
+    df = generate_tweets(2000, n_users=150, seed=4)
+    # Rows without an author are never selected.
+    df.loc[df.index[[3, 500, -1]], "name"] = None
+    return df
+
+
+def _expected_rows(df: pd.DataFrame, users) -> np.ndarray:
+    return np.flatnonzero(df["name"].isin(users).to_numpy())
+
+
+@pytest.mark.parametrize("count", [1, 10, 100])
+def test_rows_match_a_filter_on_the_name_column(df, count):
+    users = df["name"].dropna().drop_duplicates().sample(count, random_state=count)
+    index = UserRowIndex(df["name"])
+
+    rows = index.get_rows(users)
+
+    np.testing.assert_array_equal(rows, _expected_rows(df, users))
+    for user in users[:5]:
+        np.testing.assert_array_equal(
+            index.get_rows([user]), np.flatnonzero(df["name"] == user)
+        )
+
+
+def test_unknown_users_are_ignored(df):
+    index = UserRowIndex(df["name"])
+    known = df["name"].dropna().iloc[0]
+
+    assert index.get_rows(["nobody"]).tolist() == []
+    assert index.get_rows([]).tolist() == []
+    np.testing.assert_array_equal(
+        index.get_rows(["nobody", known, "nobody else"]),
+        np.flatnonzero(df["name"] == known),
+    )
+
+
+def test_users_are_the_distinct_names(df):
+    index = UserRowIndex(df["name"])
+
+    assert len(index) == df["name"].nunique()
+    assert sorted(index.users) == sorted(df["name"].dropna().unique())
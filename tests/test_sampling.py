@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_interactions
+from src.app.utils.constants import SamplingStrategy
+from src.app.utils.sampling import (
+    SAMPLING_STRATEGIES,
+    edge_stratified_sample,
+    sample_network,
+    top_degree_ego_sample,
+)
+from src.app.utils.utils import create_user_network
+
+MAX_NODES = 50
+
+
+@pytest.fixture(scope="module")
+def network():
+    return create_user_network(generate_interactions(2000, n_users=400, seed=1))
+
+
+@pytest.mark.parametrize("strategy", list(SamplingStrategy))
+def test_sample_is_a_set_of_existing_users_within_budget(network, strategy):
+    sample = SAMPLING_STRATEGIES[strategy](network, MAX_NODES, np.random.default_rng(0))
+
+    assert sample.dtype == np.int64
+    assert len(np.unique(sample)) == len(sample)
+    assert ((sample >= 0) & (sample < network.number_of_users())).all()
+    if strategy == SamplingStrategy.EDGE_STRATIFIED:
+        assert 0 < len(sample) <= MAX_NODES
+    else:
+        assert len(sample) == MAX_NODES
+
+
+@pytest.mark.parametrize("strategy", list(SamplingStrategy))
+def test_sample_network_is_deterministic_for_a_seed(network, strategy):
+    first = sample_network(network, strategy, MAX_NODES, seed=7)
+    second = sample_network(network, strategy, MAX_NODES, seed=7)
+
+    assert first.users.names == second.users.names
+    assert first.edge_table().equals(second.edge_table())
+
+
+@pytest.mark.parametrize(
+    "strategy",
+    [
+        SamplingStrategy.FOREST_FIRE,
+        SamplingStrategy.RANDOM_WALK,
+        SamplingStrategy.EDGE_STRATIFIED,
+    ],
+)
+def test_random_strategies_depend_on_the_seed(network, strategy):
+    first = sample_network(network, strategy, MAX_NODES, seed=1)
+    second = sample_network(network, strategy, MAX_NODES, seed=2)
+
+    assert set(first.users.names) != set(second.users.names)
+
+
+def test_sample_network_keeps_the_edges_between_sampled_users(network):
+    sample = sample_network(network, SamplingStrategy.FOREST_FIRE, MAX_NODES)
+    names = set(sample.users.names)
+    expected = network.edge_table()
+    expected = expected[expected["source"].isin(names) & expected["target"].isin(names)]
+
+    assert sample.number_of_users() == MAX_NODES
+    assert sample.number_of_edges() == len(expected)
+    assert sample.edge_table()["weight"].sum() == expected["weight"].sum()
+
+
+def test_sample_network_returns_a_small_network_unchanged(network):
+    assert sample_network(network, SamplingStrategy.RANDOM_WALK, 10_000) is network
+
+
+def test_top_degree_ego_sample_starts_with_the_best_connected_user(network):
+    sample = top_degree_ego_sample(network, 200, np.random.default_rng(0))
+    degrees = network.degrees()
+    hub = sample[0]
+
+    neighbours = set(network.neighbors(hub).tolist()) - {hub}
+
+    assert degrees[hub] == degrees.max()
+    assert len(neighbours) < len(sample)
+    assert set(sample[: len(neighbours) + 1].tolist()) == neighbours | {hub}
+
+
+def test_edge_stratified_sample_only_takes_users_with_edges():
+    df = pd.DataFrame(
+        {
+            "who": ["a", "a", "a", "a", "b", "c", "e"],
+            "to_whom": ["b", "b", "b", "b", "c", "d", "e"],
+            "interaction_type": ["reply"] * 7,
+        }
+    )
+    network = create_user_network(df)
+
+    sample = edge_stratified_sample(network, 3, np.random.default_rng(0))
+    names = {network.get_username(user_id) for user_id in sample}
+
+    assert len(sample) == 3
+    assert "e" not in names
+    # The single edge of the strongest stratum (a-b, weight 4) comes right after
+    # the first edge of the weight-1 stratum.
+    assert "a" in names
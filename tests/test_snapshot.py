@@ -0,0 +1,132 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.app.utils import snapshot
+from src.app.utils.community_engines import CommunityResult
+from src.app.utils.metrics import CentralityOptions
+from src.app.utils.utils import create_user_network
+
+
+@pytest.fixture
+def network():
+    df = pd.DataFrame(
+        {
+            "who": ["a", "b", "a", "c", "d"],
+            "to_whom": ["b", "a", "c", "d", "d"],
+            "interaction_type": ["reply", "retweet", "reply", "mention", "reply"],
+            "timestamp": pd.date_range("2024-01-01", periods=5, freq="h"),
+        }
+    )
+    return create_user_network(df)
+
+
+def _python_edges(network) -> pd.DataFrame:
+    edges = network.edge_table()
+    edges["tweets"] = [sorted(value) for value in edges["tweets"]]
+    return edges
+
+
+def test_network_round_trip(network, tmp_path):
+    network.rows_count = 5
+    snapshot.save_network(network, tmp_path)
+
+    assert snapshot.has_snapshot(tmp_path)
+    loaded = snapshot.load_network(tmp_path)
+
+    assert loaded.users.names == network.users.names
+    assert loaded.rows_count == 5
+    assert np.array_equal(loaded.degrees(), network.degrees())
+    pd.testing.assert_frame_equal(_python_edges(loaded), _python_edges(network))
+
+
+def test_loaded_network_has_the_edge_table_types_of_a_built_one(network, tmp_path):
+    snapshot.save_network(network, tmp_path)
+    loaded = snapshot.load_network(tmp_path)
+
+    edges = loaded.edge_table(usernames=False)
+    built = network.edge_table(usernames=False)
+    assert edges.dtypes.equals(built.dtypes)
+    assert isinstance(edges["interaction_types"][0], dict)
+    assert isinstance(edges["tweets"][0], list)
+
+    loaded.add_edges([], [("a", "b", _edge(tweet=10)), ("b", "e", _edge(tweet=11))])
+    network.add_edges([], [("a", "b", _edge(tweet=10)), ("b", "e", _edge(tweet=11))])
+    pd.testing.assert_frame_equal(_python_edges(loaded), _python_edges(network))
+
+
+def test_sample_of_a_loaded_network_round_trips(network, tmp_path):
+    snapshot.save_network(network, tmp_path / "full")
+    sample = snapshot.load_network(tmp_path / "full").subnetwork([0, 1, 2])
+    snapshot.save_network(sample, tmp_path / "sample")
+
+    loaded = snapshot.load_network(tmp_path / "sample")
+
+    pd.testing.assert_frame_equal(
+        _python_edges(loaded), _python_edges(network.subnetwork([0, 1, 2]))
+    )
+
+
+def test_metrics_round_trip_per_centrality_options(network, tmp_path):
+    exact = CentralityOptions()
+    approximate = CentralityOptions(approximate=True, samples=2, seed=1)
+    network.get_metric_values("pagerank", exact)
+    snapshot.save_network(network, tmp_path)
+    snapshot.save_metrics(network, tmp_path, exact)
+
+    loaded = snapshot.load_network(tmp_path)
+    assert snapshot.load_metrics(loaded, tmp_path, approximate) == 0
+    assert snapshot.load_metrics(loaded, tmp_path, exact) == 1
+    np.testing.assert_array_equal(
+        loaded.computed_metric_values(exact)["pagerank"].values,
+        network.get_metric_values("pagerank", exact).values,
+    )
+
+
+def test_partition_round_trip(tmp_path):
+    result = CommunityResult(
+        {0: 1, 1: 1, 2: 0}, modularity=0.25, runtime=0.5, engine="Louvain"
+    )
+    key = snapshot.partition_key(100, "Louvain", {"resolution": 1.0})
+
+    snapshot.save_partition(tmp_path, key, result)
+
+    assert snapshot.load_partition(tmp_path, key) == result
+    assert snapshot.load_partition(tmp_path, key + "other") is None
+
+
+def test_evict_snapshots_removes_least_recently_used_datasets(network, tmp_path):
+    for age, file_hash in enumerate(["new", "middle", "old"]):
+        path = snapshot.snapshot_path(tmp_path, file_hash)
+        snapshot.save_network(network, path)
+        used = 1_000_000 - age * 1000
+        os.utime(path / "manifest.json", (used, used))
+    dataset_size = sum(
+        file.stat().st_size for file in (tmp_path / "new").rglob("*") if file.is_file()
+    )
+    snapshot.load_network(snapshot.snapshot_path(tmp_path, "old"))
+
+    freed = snapshot.evict_snapshots(tmp_path, max_bytes=2 * dataset_size)
+
+    assert freed == dataset_size
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["new", "old"]
+
+
+def test_evict_snapshots_never_removes_the_kept_dataset(network, tmp_path):
+    path = snapshot.snapshot_path(tmp_path, "only", 10, "Forest fire", 1)
+    snapshot.save_network(network, path)
+
+    assert snapshot.evict_snapshots(tmp_path, max_bytes=0, keep=[path]) == 0
+    assert snapshot.has_snapshot(path)
+
+
+def _edge(tweet: int) -> dict:
+    return {
+        "weight": 1,
+        "interaction_types": {"reply": 1},
+        "first_timestamp": pd.Timestamp("2024-02-01"),
+        "last_timestamp": pd.Timestamp("2024-02-01"),
+        "tweets": [tweet],
+    }